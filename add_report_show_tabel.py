@@ -47,6 +47,8 @@ from qgis.PyQt import QtWidgets
 from qgis.gui import QgsFileWidget
 import pandas as pd
 import numpy as np
+import codecs
+import mmap
 import os
 
 swmm_layer = QgsProject.instance().mapLayer('[% @layer_id %]')
@@ -411,24 +413,51 @@ def get_rpt_df(topic, readfile):
         return (pd.DataFrame())
 
 
-def get_rpt_txt(readfile):
-    # open file with different encodings
+def get_rpt_encoding(mapped_text, chunk_size=1048576):
+    """
+    finds the first encoding which can decode the whole text;
+    the text is validated chunkwise without keeping the decoded text
+    (the same as in g_s_read_text.py; this script has to be self-contained)
+    :param mmap.mmap mapped_text
+    :param int chunk_size: bytes per validation step
+    :return: str
+    """
     encodings = [
         'utf-8',
         'windows-1250',
         'windows-1252'
     ]  # add more?
     for e in encodings:
+        decoder = codecs.getincrementaldecoder(e)()
         try:
-            with open(readfile, 'r', encoding=e) as f:
-                rpt_text = f.readlines()
+            for chunk_start in range(0, len(mapped_text), chunk_size):
+                decoder.decode(mapped_text[chunk_start:chunk_start+chunk_size])
+            decoder.decode(b'', final=True)
         except UnicodeDecodeError:
-            pass
-        else:
-            break
-    rpt_text = [x for x in rpt_text if x != '\n']
-    rpt_text = [x for x in rpt_text if x != '\r']
-    rpt_text = [x.strip() for x in rpt_text]
+            continue
+        return e
+    return None
+
+
+def get_rpt_txt(readfile):
+    """
+    reads the non-empty lines of a report file; the file is
+    memory-mapped once and decoded after the encoding was detected
+    :param str readfile
+    :return: list
+    """
+    if os.path.getsize(readfile) == 0:
+        return []
+    with open(readfile, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped_text:
+            encoding = get_rpt_encoding(mapped_text)
+            if encoding is None:
+                encoding, decode_errors = 'windows-1252', 'replace'
+            else:
+                decode_errors = 'strict'
+            rpt_text = [
+                x.decode(encoding, decode_errors).strip() for x in iter(mapped_text.readline, b'')
+            ]
     rpt_text = [x for x in rpt_text if len(x) > 0]
     # delete last three lines of the file (information on start and end time)
     rpt_text = rpt_text[:-3]
@@ -645,6 +674,6 @@ if layer_geom in swmm_geom_types.keys():
 else:
     QtWidgets.QMessageBox.information(
         None,
-        Info",
+        "Info",
         'Cannot show results for this data type'
     )
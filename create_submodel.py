@@ -336,7 +336,8 @@ class CreateSubModel(QgsProcessingAlgorithm):
                 subcatch_layers_dict['SUBCATCHMENTS'],
                 needed_subc_attrs,
                 with_id=True,
-                feedback = feedback
+                feedback = feedback,
+                with_geometry=False
             )
             subc_df = subc_df_dict[needed_subc_attrs+['id']]
 
@@ -352,7 +353,8 @@ class CreateSubModel(QgsProcessingAlgorithm):
                 raingages_layer_dict['RAINGAGES'],
                 needed_rg_attrs,
                 with_id=True,
-                feedback = feedback
+                feedback = feedback,
+                with_geometry=False
             )
             rg_df = rg_df_dict[needed_rg_attrs+['id']]
 
@@ -367,7 +369,8 @@ class CreateSubModel(QgsProcessingAlgorithm):
                 vlayer,
                 needed_nodes_attrs,
                 with_id=True,
-                feedback = feedback
+                feedback = feedback,
+                with_geometry=False
             ) for layer_name, vlayer in nodes_layers_dict.items()}
             # get startpoint...
             start_point = ''
@@ -411,7 +414,8 @@ class CreateSubModel(QgsProcessingAlgorithm):
                 vlayer,
                 needed_link_attrs,
                 with_id=True,
-                feedback = feedback
+                feedback = feedback,
+                with_geometry=False
             ) for layer_name, vlayer in link_layers_dict.items()}
             all_links_df = pd.concat([i for i in links_df_dict.values()])
             all_links_df = all_links_df[needed_link_attrs+['id']]
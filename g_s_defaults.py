@@ -830,6 +830,18 @@ def_tables_dict = {
     }
 }
 
+# sections of the input file which are needed for the tables
+def_tables_inp_sections_dict = {
+    'OPTIONS': ['OPTIONS'],
+    'INFLOWS': ['INFLOWS', 'DWF', 'HYDROGRAPHS', 'RDII'],
+    'PATTERNS': ['PATTERNS'],
+    'CURVES': ['CURVES'],
+    'QUALITY': ['POLLUTANTS', 'LANDUSES', 'COVERAGES', 'LOADINGS', 'BUILDUP', 'WASHOFF'],
+    'TIMESERIES': ['TIMESERIES'],
+    'TRANSECTS': ['TRANSECTS'],
+    'STREETS': ['STREETS', 'INLETS', 'INLET_USAGE']
+}
+
 
 # geometries of SWMM layers in QGIS
 def_sections_geoms_dict = {
@@ -858,6 +870,20 @@ def_sections_geoms_list = [  # the same as a list to keep the order (needed for
     'WEIRS',
     'OUTLETS'
 ]
+# sections which are joined to the geometry sections on import
+def_sections_joins_dict = {
+    'RAINGAGES': {'data_join': [], 'geom_join': ['SYMBOLS']},
+    'SUBCATCHMENTS': {'data_join': ['SUBAREAS', 'INFILTRATION'], 'geom_join': ['POLYGONS']},
+    'JUNCTIONS': {'data_join': [], 'geom_join': ['COORDINATES']},
+    'OUTFALLS': {'data_join': [], 'geom_join': ['COORDINATES']},
+    'DIVIDERS': {'data_join': [], 'geom_join': ['COORDINATES']},
+    'STORAGE': {'data_join': [], 'geom_join': ['COORDINATES']},
+    'CONDUITS': {'data_join': ['XSECTIONS', 'LOSSES'], 'geom_join': ['VERTICES', 'COORDINATES']},
+    'PUMPS': {'data_join': [], 'geom_join': ['VERTICES', 'COORDINATES']},
+    'ORIFICES': {'data_join': ['XSECTIONS'], 'geom_join': ['VERTICES', 'COORDINATES']},
+    'WEIRS': {'data_join': ['XSECTIONS'], 'geom_join': ['VERTICES', 'COORDINATES']},
+    'OUTLETS': {'data_join': [], 'geom_join': ['VERTICES', 'COORDINATES']}
+}
 
 
 # style_file
@@ -1085,6 +1111,10 @@ def_ogr_driver_dict = {
     'KML': 'kml'
 }
 def_ogr_driver_names = list(def_ogr_driver_dict.keys())
+# file name for the all-in-one GeoPackage of the import function
+def_all_in_one_gpkg_name = 'SWMM_model'
+# metadata item with the result prefix of the layers in the all-in-one GeoPackage
+def_all_in_one_gpkg_prefix_key = 'GENERATE_SWMM_INP_RESULT_PREFIX'
 
 class ImportDataStatus:
     RAW = 0
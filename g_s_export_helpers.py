@@ -28,6 +28,7 @@ __copyright__ = '(C) 2021 by Jannik Schilling'
 import pandas as pd
 from qgis.PyQt.QtCore import QTime, QDate
 from qgis.core import (
+    QgsGeometry,
     QgsWkbTypes,
     QgsProcessingException
 )
@@ -414,6 +415,11 @@ def get_coords_from_geometry(df):
     line_t_names = list(geom_line_types.keys())
     polygon_t_names = list(geom_polygon_types.keys())
 
+    if any(isinstance(g, bytes) for g in df['geometry']):
+        # geometries read as wkb (e.g. from GeoPackages)
+        df = df.copy()
+        df['geometry'] = [geometry_from_wkb(g) for g in df['geometry']]
+
     # case: points
     if all(
         QgsWkbTypes.displayString(
@@ -469,6 +475,16 @@ def get_coords_from_geometry(df):
             'Geometry type of one or more features could not be handled'
         )
 
+def geometry_from_wkb(wkb):
+    """
+    :param bytes wkb
+    :return: QgsGeometry
+    """
+    geom = QgsGeometry()
+    geom.fromWkb(wkb)
+    return geom
+
+
 def extract_xyz_from_simple_point(p_name, point_simple):
     """
     Extract X, Y, and Z coordinates from a simple point.
@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ GenerateSwmmInp
+                                 A QGIS plugin
+ This plugin generates SWMM Input files
+ Generated by Plugin Builder: http://g-sherman.github.io/Qgis-Plugin-Builder/
+                              -------------------
+        begin                : 2021-07-09
+        copyright            : (C) 2021 by Jannik Schilling
+        email                : jannik.schilling@posteo.de
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+__author__ = 'Jannik Schilling'
+__date__ = '2024-04-26'
+__copyright__ = '(C) 2021 by Jannik Schilling'
+
+import hashlib
+import os
+import shutil
+import numpy as np
+import pandas as pd
+from qgis.core import (
+    NULL,
+    QgsApplication,
+    QgsGeometry
+)
+from qgis.PyQt.QtCore import QVariant
+from .g_s_defaults import ImportDataStatus
+
+# number of input files kept in the cache
+def_import_cache_max_files = 5
+
+
+def get_plugin_version():
+    """
+    reads the plugin version from metadata.txt
+    :return: str
+    """
+    metadata_file = os.path.join(os.path.dirname(__file__), 'metadata.txt')
+    with open(metadata_file, encoding='utf-8') as f:
+        for line in f:
+            if line.startswith('version='):
+                return line.split('=', 1)[1].strip()
+    return 'unknown'
+
+
+def get_file_hash(readfile, chunk_size=1048576):
+    """
+    sha256 of the file content
+    :param str readfile
+    :param int chunk_size
+    :return: str
+    """
+    file_hash = hashlib.sha256()
+    with open(readfile, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
+def get_import_cache_root():
+    """
+    the cache is kept in the QGIS profile of the user, because
+    the cached files are loaded with pickle
+    :return: str
+    """
+    return os.path.join(
+        QgsApplication.qgisSettingsDirPath(),
+        'generate_swmm_inp',
+        'import_cache'
+    )
+
+
+def get_import_cache_folder(readfile):
+    """
+    cache folder for an input file;
+    one folder per content of the input file and plugin version
+    :param str readfile
+    :return: str
+    """
+    return os.path.join(
+        get_import_cache_root(),
+        get_file_hash(readfile) + '_' + get_plugin_version()
+    )
+
+
+def clean_import_cache(cache_folder, max_files=def_import_cache_max_files):
+    """
+    marks the cache folder of the current input file as used and deletes
+    the least recently used folders if more than max_files input files are cached
+    :param str cache_folder
+    :param int max_files
+    """
+    cache_root = get_import_cache_root()
+    if not os.path.isdir(cache_root):
+        return
+    if os.path.isdir(cache_folder):
+        os.utime(cache_folder)
+    other_folders = [
+        f.path for f in os.scandir(cache_root) if f.is_dir() and f.path != cache_folder
+    ]
+    other_folders.sort(key=os.path.getmtime, reverse=True)
+    for old_folder in other_folders[max_files-1:]:
+        shutil.rmtree(old_folder, ignore_errors=True)
+
+
+def read_cache_item(cache_folder, item_name):
+    """
+    reads an item from the cache
+    :param str cache_folder
+    :param str item_name
+    :return: cached item or None if the item is not in the cache
+    """
+    item_file = os.path.join(cache_folder, item_name + '.pkl')
+    if not os.path.isfile(item_file):
+        return None
+    try:
+        return pd.read_pickle(item_file)
+    except Exception:
+        # incomplete or incompatible files are ignored
+        return None
+
+
+def write_cache_item(cache_folder, item_name, item, feedback):
+    """
+    writes an item to the cache; the file is replaced at once,
+    so that a canceled import does not leave incomplete files
+    :param str cache_folder
+    :param str item_name
+    :param item: picklable object
+    :param QgsProcessingFeedback feedback
+    """
+    item_file = os.path.join(cache_folder, item_name + '.pkl')
+    try:
+        os.makedirs(cache_folder, mode=0o700, exist_ok=True)
+        pd.to_pickle(item, item_file + '.tmp', compression=None)
+        os.replace(item_file + '.tmp', item_file)
+    except OSError as e:
+        feedback.pushWarning('Could not write the import cache: ' + str(e))
+
+
+# tokenized sections
+def sections_to_cache(dict_all_vals, unknown_sections):
+    """
+    stores the tokenized lines of every section as a table
+    (one column per position in the lines) and the line lengths
+    :param dict dict_all_vals
+    :param list unknown_sections
+    :return: dict
+    """
+    sections_cache = {}
+    for section_name, data_dict in dict_all_vals.items():
+        section_cache = {k: v for k, v in data_dict.items() if k != 'data'}
+        section_cache['tokens'] = pd.DataFrame(data_dict['data'], dtype=object)
+        section_cache['line_lengths'] = np.array(
+            [len(inp_line) for inp_line in data_dict['data']],
+            dtype=np.int32
+        )
+        sections_cache[section_name] = section_cache
+    return {'sections': sections_cache, 'unknown_sections': unknown_sections}
+
+
+def sections_from_cache(cached_sections, section_filter=None):
+    """
+    restores the tokenized sections from the cache
+    :param dict cached_sections
+    :param function section_filter: returns True for section names to restore
+    :return: tuple (dict, list): raw data for every section, unknown section headers
+    """
+    dict_all_vals = {}
+    for section_name, section_cache in cached_sections['sections'].items():
+        if section_filter is not None and not section_filter(section_name):
+            continue
+        data_dict = {
+            k: v for k, v in section_cache.items() if k not in ['tokens', 'line_lengths']
+        }
+        token_rows = section_cache['tokens'].to_numpy(dtype=object).tolist()
+        data_dict['data'] = [
+            token_row[:n] for token_row, n in zip(token_rows, section_cache['line_lengths'].tolist())
+        ]
+        dict_all_vals[section_name] = data_dict
+    return dict_all_vals, cached_sections['unknown_sections']
+
+
+# prepared geodata
+def get_geodata_cache_name(section_name, import_parameters_dict):
+    """
+    name of a prepared section in the cache;
+    the geometries depend on the crs and on the z coordinates
+    :param str section_name
+    :param dict import_parameters_dict
+    :return: str
+    """
+    geom_params = (
+        import_parameters_dict['crs_result'],
+        import_parameters_dict['transform_crs_string'],
+        import_parameters_dict['add_z_bool'],
+        import_parameters_dict.get('link_offsets')
+    )
+    params_hash = hashlib.sha256(repr(geom_params).encode('utf-8')).hexdigest()[:16]
+    return section_name + '_' + params_hash
+
+
+def geodata_to_cache(df):
+    """
+    converts geometries to wkb and NULL to np.nan;
+    the positions of NULL are kept for every column
+    :param pd.DataFrame df
+    :return: dict
+    """
+    df = df.copy()
+    null_masks = {}
+    for col in df.columns:
+        if df[col].dtype == object:
+            null_mask = df[col].map(lambda x: isinstance(x, QVariant)).to_numpy(dtype=bool)
+            if null_mask.any():
+                null_masks[col] = null_mask
+        if col == 'geometry':
+            df[col] = [
+                None if g is None or isinstance(g, QVariant) else bytes(g.asWkb()) for g in df[col]
+            ]
+        elif col in null_masks.keys():
+            df[col] = df[col].where(~null_masks[col], np.nan)
+    return {'data': df, 'null_masks': null_masks}
+
+
+def wkb_to_geometry(wkb):
+    """
+    :param bytes wkb
+    :return: QgsGeometry
+    """
+    if wkb is None:
+        return None
+    geom = QgsGeometry()
+    if len(wkb) > 0:
+        geom.fromWkb(wkb)
+    return geom
+
+
+def geodata_from_cache(cached_geodata):
+    """
+    restores the geometries and the NULL values which were converted
+    by geodata_to_cache; other np.nan values are kept
+    :param dict cached_geodata
+    :return: pd.DataFrame
+    """
+    df = cached_geodata['data']
+    df['geometry'] = [wkb_to_geometry(wkb) for wkb in df['geometry']]
+    for col, null_mask in cached_geodata['null_masks'].items():
+        df[col] = df[col].astype(object).where(~null_mask, NULL)
+    return df
+
+
+def load_geodata_from_cache(
+    section_list,
+    dict_all_vals,
+    cache_folder,
+    import_parameters_dict,
+    feedback
+):
+    """
+    loads prepared sections from the cache
+    :param list section_list
+    :param dict dict_all_vals
+    :param str cache_folder
+    :param dict import_parameters_dict
+    :param QgsProcessingFeedback feedback
+    :return: list: sections which still have to be prepared
+    """
+    sections_to_prepare = []
+    for section_name in section_list:
+        if section_name not in dict_all_vals.keys():
+            continue
+        cached_geodata = read_cache_item(
+            cache_folder,
+            get_geodata_cache_name(section_name, import_parameters_dict)
+        )
+        if cached_geodata is None:
+            sections_to_prepare.append(section_name)
+        else:
+            feedback.setProgressText('Section \"' + section_name + '\" loaded from the cache')
+            dict_all_vals[section_name]['data'] = geodata_from_cache(cached_geodata)
+            dict_all_vals[section_name]['status'] = ImportDataStatus.GEOM_READY
+    return sections_to_prepare
+
+
+def save_geodata_to_cache(
+    section_list,
+    dict_all_vals,
+    cache_folder,
+    import_parameters_dict,
+    feedback
+):
+    """
+    saves the prepared sections (e.g. before an import was canceled)
+    :param list section_list
+    :param dict dict_all_vals
+    :param str cache_folder
+    :param dict import_parameters_dict
+    :param QgsProcessingFeedback feedback
+    """
+    for section_name in section_list:
+        if section_name not in dict_all_vals.keys():
+            continue
+        if dict_all_vals[section_name]['status'] == ImportDataStatus.GEOM_READY:
+            write_cache_item(
+                cache_folder,
+                get_geodata_cache_name(section_name, import_parameters_dict),
+                geodata_to_cache(dict_all_vals[section_name]['data']),
+                feedback
+            )
@@ -28,6 +28,15 @@ import pandas as pd
 import numpy as np
 import copy
 import os
+from collections import (
+    Counter,
+    deque
+)
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    wait
+)
 from qgis.PyQt.QtGui import QColor
 from qgis.PyQt.QtCore import (
     QDate,
@@ -44,28 +53,31 @@ from .g_s_defaults import (
     annotation_field_name,
     def_sections_dict,
     def_sections_geoms_dict,
-    def_qgis_fields_dict,
+    def_sections_joins_dict,
+    def_tables_dict,
+    def_tables_inp_sections_dict,
     ImportDataStatus,
     st_files_path
 )
 from .g_s_nodes import (
-    add_z_to_points,
     create_points_df,
-    get_storages_from_inp,
-    get_outfalls_from_inp,
-    get_dividers_from_inp
+    create_points_for_section,
+    get_node_elevations,
+    transform_coords_df
 )
 from .g_s_subcatchments import (
-    get_raingages_from_inp,
     create_polygons_df,
     prepare_infiltration_inp_lines,
     create_infiltr_df
 )
 from .g_s_links import (
-    add_z_to_lines,
     create_lines_for_section,
-    adjust_xsection_df,
-    adjust_outlets_list
+    adjust_xsection_df
+)
+from .g_s_read_text import read_sections_first_values
+from .g_s_inp_layouts import (
+    build_df_by_layout,
+    def_inp_layouts_dict
 )
 
 
@@ -114,19 +126,25 @@ def sect_list_import_handler(
             df_join = build_df_sect_direct(section_name, data_dict)
             feedback.setProgress(5)
             if out_type == 'geom_join':
-                feedback.setProgressText('Creating points or vertices...')
+                feedback.setProgressText('Reading coordinates of points or vertices...')
                 dict_all_vals[section_name]['data'] = create_points_df(df_join, feedback)
+                if (
+                    import_parameters_dict is not None
+                    and import_parameters_dict.get('coord_transform') is not None
+                ):
+                    # coordinates are transformed before the geometries are created
+                    feedback.setProgressText('Transforming coordinates of section \"'+section_name+'\"')
+                    dict_all_vals[section_name]['data'] = transform_coords_df(
+                        dict_all_vals[section_name]['data'],
+                        import_parameters_dict['coord_transform']
+                    )
             if out_type == 'data_join':
                 # adjustments
                 if section_name == 'XSECTIONS':
                     df_join = adjust_xsection_df(df_join)
                 if section_name == 'INFILTRATION':
                     df_join = df_join.apply(lambda x: create_infiltr_df(x), axis=1)
-                try:
-                    df_join = df_join.map(replace_nan_null)
-                except BaseException:
-                    # for pandas prior to 2.1.0:
-                    df_join = df_join.applymap(replace_nan_null)
+                df_join = replace_nan_null_df(df_join)
                 data_dict['data'] = df_join.set_index('Name')
             dict_all_vals[section_name]['status'] = ImportDataStatus.PROCESSED
         feedback.setProgress(100)
@@ -139,24 +157,12 @@ def sect_list_import_handler(
             data_dict = dict_all_vals[section_name]
             feedback.setProgress(1)
             if out_type == 'geodata':
-                # data preparation
-                if section_name == 'RAINGAGES':
-                    data_dict['data'] = [get_raingages_from_inp(inp_line, feedback) for inp_line in data_dict['data']]
-                    diff_fields = list(def_qgis_fields_dict[section_name].keys())
-                if section_name == 'STORAGE':
-                    data_dict['data'] = [get_storages_from_inp(inp_line, feedback) for inp_line in data_dict['data']]
-                if section_name == 'OUTFALLS':
-                    data_dict['data'] = [get_outfalls_from_inp(inp_line, feedback) for inp_line in data_dict['data']]
-                if section_name == 'DIVIDERS':
-                    data_dict['data'] = [get_dividers_from_inp(inp_line, feedback) for inp_line in data_dict['data']]
-                if section_name == 'OUTLETS':
-                    data_dict['data'] = [adjust_outlets_list(inp_line, feedback) for inp_line in data_dict['data']]
-                if section_name == 'RAINGAGES':
-                    df_processed = build_df_sect_direct(
+                # data preparation; sections with variable line layouts
+                if section_name in def_inp_layouts_dict.keys():
+                    df_processed = build_df_by_layout(
                             section_name,
                             data_dict,
-                            with_annot=True,
-                            diff_fields=diff_fields
+                            with_annot=True
                         )
                 else:
                     df_processed = build_df_sect_direct(
@@ -202,21 +208,43 @@ def sect_list_import_handler(
                         df_processed = df_processed.join(df_for_join, on='Name')
                 feedback.setProgress(80)
 
-                # get geometries
+                # get geometries (with z values if requiered)
+                add_z_section = import_parameters_dict['add_z_bool'] and section_name in [
+                    'JUNCTIONS',
+                    'OUTFALLS',
+                    'DIVIDERS',
+                    'STORAGE',
+                    'CONDUITS'
+                ]
                 if def_sections_geoms_dict[section_name] == 'Point':
                     if section_name in ['JUNCTIONS', 'STORAGE', 'OUTFALLS', 'DIVIDERS']:
-                        sect_list_import_handler('COORDINATES', dict_all_vals, 'geom_join', feedback)
-                        ft_geoms = dict_all_vals['COORDINATES']['data']
+                        sect_list_import_handler('COORDINATES', dict_all_vals, 'geom_join', feedback, import_parameters_dict)
+                        pts_coords = dict_all_vals['COORDINATES']['data']
                     if section_name == 'RAINGAGES':
-                        sect_list_import_handler('SYMBOLS', dict_all_vals, 'geom_join', feedback)
-                        ft_geoms = dict_all_vals['SYMBOLS']['data']
+                        sect_list_import_handler('SYMBOLS', dict_all_vals, 'geom_join', feedback, import_parameters_dict)
+                        pts_coords = dict_all_vals['SYMBOLS']['data']
+                    ft_geoms = create_points_for_section(
+                        df_processed,
+                        pts_coords,
+                        add_z=add_z_section
+                    )
                 if def_sections_geoms_dict[section_name] == 'LineString':
-                    sect_list_import_handler('VERTICES', dict_all_vals, 'geom_join', feedback)
-                    sect_list_import_handler('COORDINATES', dict_all_vals, 'geom_join', feedback)
+                    sect_list_import_handler('VERTICES', dict_all_vals, 'geom_join', feedback, import_parameters_dict)
+                    sect_list_import_handler('COORDINATES', dict_all_vals, 'geom_join', feedback, import_parameters_dict)
                     feedback.setProgressText('Creating lines geometries from vertices...')
-                    ft_geoms = create_lines_for_section(df_processed, dict_all_vals, feedback)
+                    if add_z_section:
+                        link_offsets = import_parameters_dict.get('link_offsets', 'elevation')
+                    else:
+                        link_offsets = None
+                    ft_geoms = create_lines_for_section(
+                        df_processed,
+                        dict_all_vals,
+                        feedback,
+                        link_offsets=link_offsets,
+                        node_elevations=import_parameters_dict.get('node_elevations')
+                    )
                 if def_sections_geoms_dict[section_name] == 'Polygon':
-                    sect_list_import_handler('POLYGONS', dict_all_vals, 'geom_join', feedback)
+                    sect_list_import_handler('POLYGONS', dict_all_vals, 'geom_join', feedback, import_parameters_dict)
                     feedback.setProgressText('Creating polygon geometries from vertices...')
                     ft_geoms = create_polygons_df(df_processed, dict_all_vals, feedback)
                 # ...and join geometries
@@ -224,31 +252,9 @@ def sect_list_import_handler(
                 feedback.setProgress(90)
                 
                 # replace nan and '*'
-                try:
-                    df_processed = df_processed.map(replace_nan_null)
-                except BaseException:
-                    # for pandas prior to 2.1.0:
-                    df_processed = df_processed.applymap(replace_nan_null)
+                df_processed = replace_nan_null_df(df_processed)
                 feedback.setProgress(94)
 
-                # add z values if requiered
-                if import_parameters_dict['add_z_bool']:
-                    if section_name in [
-                        'JUNCTIONS',
-                        'OUTFALLS',
-                        'DIVIDERS',
-                        'STORAGE',
-                        'CONDUITS'
-                    ]:
-                        if def_sections_geoms_dict[section_name] == 'Point':
-                            geometries_with_z = df_processed.apply(add_z_to_points, axis=1)
-                        if def_sections_geoms_dict[section_name] == 'LineString':
-                            geometries_with_z = df_processed.apply(
-                                add_z_to_lines,
-                                args=(import_parameters_dict, dict_all_vals),
-                                axis=1
-                            )
-                        df_processed['geometry'] = geometries_with_z
                 feedback.setProgress(97)
                 
                 
@@ -261,6 +267,232 @@ def sect_list_import_handler(
     feedback.setProgress(100)
 
 
+def get_inp_sections_needed(selected_outputs, add_z_bool=False):
+    """
+    lists the sections of the input file which are needed for the
+    selected tables and layers (including joined sections)
+    :param list selected_outputs: geometry sections and table names
+    :param bool add_z_bool
+    :return: set
+    """
+    sections_needed = {'OPTIONS'}  # always needed, e.g. for infiltration and offsets
+    for output_name in selected_outputs:
+        if output_name in def_tables_inp_sections_dict.keys():
+            sections_needed.update(def_tables_inp_sections_dict[output_name])
+        if output_name in def_sections_joins_dict.keys():
+            sections_needed.add(output_name)
+            sections_needed.update(def_sections_joins_dict[output_name]['data_join'])
+            sections_needed.update(def_sections_joins_dict[output_name]['geom_join'])
+            if add_z_bool and output_name == 'CONDUITS':
+                # node elevations
+                sections_needed.update(['JUNCTIONS', 'OUTFALLS', 'DIVIDERS', 'STORAGE'])
+    return sections_needed
+
+
+# rough estimates for the import of a section
+def_memory_per_text_byte = 8  # tokens as python strings in lists
+def_memory_per_vertex = 64  # coordinates and geometries
+def_output_per_text_byte = 1.5  # attributes in layers and tables
+def_output_per_vertex = 16
+def_output_per_feature = 100
+
+
+def get_inp_sections_stats(readfile):
+    """
+    counts rows, objects and vertices of every section with a single pass
+    over the input file and estimates the memory needed for the import
+    and the size of the imported layers and tables
+    :param str readfile
+    :return: tuple (dict, list): statistics by section, unknown section names
+    """
+    sections_values = read_sections_first_values(readfile)
+    unknown_sections = [s for s in sections_values.keys() if s not in def_sections_dict.keys()]
+    geom_join_sections = {
+        s for s_joins in def_sections_joins_dict.values() for s in s_joins['geom_join']
+    }
+    vertices_counts = Counter(sections_values.get('VERTICES', ([], 0))[0])
+    polygons_counts = Counter(sections_values.get('POLYGONS', ([], 0))[0])
+    sections_stats = {}
+    for section_name, (first_values, section_bytes) in sections_values.items():
+        if section_name in unknown_sections:
+            continue
+        if section_name == 'TRANSECTS':
+            n_objects = first_values.count(b'X1')
+        else:
+            n_objects = len(set(first_values))
+        section_geom = def_sections_geoms_dict.get(section_name)
+        if section_geom == 'Point':
+            n_vertices = n_objects
+        elif section_geom == 'LineString':
+            n_vertices = 2 * n_objects + sum(vertices_counts[n] for n in set(first_values))
+        elif section_geom == 'Polygon':
+            n_vertices = sum(polygons_counts[n] for n in set(first_values))
+        else:
+            n_vertices = 0
+        memory_bytes = section_bytes * def_memory_per_text_byte + n_vertices * def_memory_per_vertex
+        if section_name in geom_join_sections:
+            output_bytes = 0  # part of the geometries
+        else:
+            output_bytes = section_bytes * def_output_per_text_byte + n_vertices * def_output_per_vertex
+            if section_geom is not None:
+                output_bytes = output_bytes + n_objects * def_output_per_feature
+        sections_stats[section_name] = {
+            'rows': len(first_values),
+            'objects': n_objects,
+            'vertices': n_vertices,
+            'memory_mb': round(memory_bytes / 1048576, 2),
+            'output_mb': round(output_bytes / 1048576, 2)
+        }
+    return sections_stats, unknown_sections
+
+
+class SectionFeedback:
+    """
+    feedback for a section prepared in a worker thread; progress and
+    messages are collected and passed to the main feedback by flush()
+    """
+    def __init__(self, feedback):
+        self.main_feedback = feedback
+        self.progress = 0
+        self.messages = deque()
+
+    def setProgress(self, progress):
+        self.progress = progress
+
+    def setProgressText(self, text):
+        self.messages.append(('setProgressText', (text,)))
+
+    def pushInfo(self, info):
+        self.messages.append(('pushInfo', (info,)))
+
+    def pushWarning(self, warning):
+        self.messages.append(('pushWarning', (warning,)))
+
+    def reportError(self, error, fatalError=False):
+        self.messages.append(('reportError', (error, fatalError)))
+
+    def isCanceled(self):
+        return self.main_feedback.isCanceled()
+
+    def flush(self):
+        """passes the collected messages to the main feedback"""
+        while len(self.messages) > 0:
+            method_name, msg_args = self.messages.popleft()
+            getattr(self.main_feedback, method_name)(*msg_args)
+
+
+def sect_list_import_threaded(
+    section_list,
+    out_type,
+    dict_all_vals,
+    feedback,
+    import_parameters_dict
+):
+    """
+    runs sect_list_import_handler for independent sections in worker threads
+    :param list section_list
+    :param str out_type: geodata, table, data_join, geom_join
+    :param dict dict_all_vals
+    :param QgsProcessingFeedback feedback
+    :param dict import_parameters_dict
+    """
+    section_feedbacks = {s: SectionFeedback(feedback) for s in section_list}
+    n_workers = min(len(section_list), os.cpu_count() or 1)
+    feedback.setProgressText(
+        'Preparing ' + str(len(section_list)) + ' sections with '
+        + str(n_workers) + ' threads'
+    )
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        futures_pending = {
+            executor.submit(
+                sect_list_import_handler,
+                section_name,
+                dict_all_vals,
+                out_type,
+                section_feedbacks[section_name],
+                import_parameters_dict
+            ) for section_name in section_list
+        }
+        futures_done = set()
+        while len(futures_pending) > 0:
+            futures_new_done, futures_pending = wait(
+                futures_pending,
+                timeout=0.2,
+                return_when=FIRST_COMPLETED
+            )
+            futures_done.update(futures_new_done)
+            for section_fb in section_feedbacks.values():
+                section_fb.flush()
+            feedback.setProgress(
+                sum(f_s.progress for f_s in section_feedbacks.values()) / len(section_list)
+            )
+            if feedback.isCanceled():
+                for future_i in futures_pending:
+                    future_i.cancel()
+        for future_i in futures_done:
+            if not future_i.cancelled():
+                future_i.result()  # raises errors of the workers
+
+
+def sect_list_import_geodata_parallel(
+    section_list,
+    dict_all_vals,
+    feedback,
+    import_parameters_dict
+):
+    """
+    prepares the geometry sections in worker threads;
+    joined sections are prepared once before the sections
+    (coordinates, vertices and polygons in parallel)
+    :param list section_list: geometry sections to prepare (in order)
+    :param dict dict_all_vals
+    :param QgsProcessingFeedback feedback
+    :param dict import_parameters_dict
+    """
+    section_list = [s for s in section_list if s in dict_all_vals.keys()]
+    joins_needed = {'data_join': [], 'geom_join': []}
+    for out_type in joins_needed.keys():
+        for section_name in section_list:
+            joins_needed[out_type] += [
+                j for j in def_sections_joins_dict[section_name][out_type] if j not in joins_needed[out_type]
+            ]
+    # shared joins
+    for sect_join in joins_needed['data_join']:
+        if feedback.isCanceled():
+            return
+        sect_list_import_handler(
+            sect_join,
+            dict_all_vals,
+            'data_join',
+            feedback,
+            import_parameters_dict
+        )
+    if len(joins_needed['geom_join']) > 0:
+        # coordinates are read (and transformed) independently
+        sect_list_import_threaded(
+            joins_needed['geom_join'],
+            'geom_join',
+            dict_all_vals,
+            feedback,
+            import_parameters_dict
+        )
+    if feedback.isCanceled():
+        return
+    if import_parameters_dict['add_z_bool']:
+        # raw node data would be changed while the node sections are prepared
+        import_parameters_dict['node_elevations'] = get_node_elevations(dict_all_vals)
+    # sections
+    if len(section_list) > 0:
+        sect_list_import_threaded(
+            section_list,
+            'geodata',
+            dict_all_vals,
+            feedback,
+            import_parameters_dict
+        )
+    import_parameters_dict.pop('node_elevations', None)
+
+
 def build_df_sect_direct(
     section_name,
     data_dict,
@@ -324,98 +556,109 @@ def concat_quoted_vals(text_line):
     """
     finds quoted text and cocatenates text strings if
     they have been separated by whitespace or other separators
-    :param str texline
-    """
-    if any([x.startswith('"') for x in text_line]):  # any quoted elements
-        text_line_new = []
-        i = 0
-        quoted_elem = 0  # set not quoted
-        for t_l in text_line:
-            if quoted_elem == 0:  # is not quoted
-                text_line_new = text_line_new + [[t_l]]
-                if t_l.startswith('"'):
-                    quoted_elem = 1  # set quoted
-                    # t_l is not '"' and fully quoted (e.g. '"test"')
-                    if len(t_l) > 1 and t_l.endswith('"'):
-                        quoted_elem = 0  # set not quoted again
-                        i += 1
-                else:
-                    i += 1
-            else:  # is quoted and has been separated
-                text_line_new[i] = text_line_new[i]+[t_l]
-                if t_l.endswith('"'):
-                    quoted_elem = 0  # set not quoted again
-                    i += 1
-                else:
-                    pass  # keep quoted and i
-        text_line_new = [' '.join(x) for x in text_line_new]  # concatenate strings
-    else:
-        text_line_new = text_line
+    :param list text_line
+    :return: list
+    """
+    text_line_new = []
+    quoted_elem = []  # parts of a quoted element
+    for t_l in text_line:
+        if len(quoted_elem) == 0:  # is not quoted
+            if t_l.startswith('"') and not (len(t_l) > 1 and t_l.endswith('"')):
+                quoted_elem.append(t_l)  # set quoted
+            else:
+                text_line_new.append(t_l)  # not quoted or fully quoted (e.g. '"test"')
+        else:  # is quoted and has been separated
+            quoted_elem.append(t_l)
+            if t_l.endswith('"'):
+                text_line_new.append(' '.join(quoted_elem))
+                quoted_elem = []  # set not quoted again
+    if len(quoted_elem) > 0:  # closing quote is missing
+        text_line_new.append(' '.join(quoted_elem))
     return text_line_new
 
 
-def replace_nan_null(data):
-    """replaces np.nan or asterisk with NULL"""
-    if pd.isna(data):
-        return NULL
-    elif data == '*':
-        return NULL
-    else:
-        return data
+def replace_nan_null_df(df):
+    """
+    replaces np.nan or asterisk with NULL column by column;
+    numeric columns can only contain np.nan, the geometry column
+    is only checked for missing values
+    :param pd.DataFrame df
+    :return: pd.DataFrame
+    """
+    df = df.copy()
+    for col in df.columns:
+        col_vals = df[col]
+        null_mask = col_vals.isna()
+        if col != 'geometry' and not pd.api.types.is_numeric_dtype(col_vals.dtype):
+            null_mask = null_mask | (col_vals.astype(object) == '*')
+        if null_mask.any():
+            df[col] = col_vals.astype(object).where(~null_mask, NULL)
+    return df
 
 
-def get_annotations(
-    section_text,
-    startpoint,
-    endpoint,
-    section_len
-):
+def tokenize_inp_lines(inp_lines):
     """
-    concats annotations for a feature
-    :param list section text
-    :param int startpoint
-    :param int endpoint
-    :param in section_len
+    reads the lines of an input file in a single pass;
+    yields a tuple (record type, value) for every relevant line:
+    ('section', '[SECTION]'), ('annotation', str) or ('row', list)
+    :param iterable inp_lines: e.g. an open text file
     """
-    annot_text_list = [x[1:] for x in section_text[startpoint:(endpoint+1)]]
-    annot_text = ' '.join(annot_text_list)
-    if endpoint+1 != section_len:
-        feature_name = section_text[endpoint+1].split()[0]
-        return [feature_name, annot_text]
+    for inp_line in inp_lines:
+        inp_line = inp_line.strip()
+        if len(inp_line) == 0 or inp_line.startswith(';;'):
+            continue  # empty lines and column headers
+        if inp_line.startswith('[') and inp_line.endswith(']'):
+            yield ('section', inp_line)
+        elif inp_line.startswith(';'):
+            yield ('annotation', inp_line[1:])
+        else:
+            inp_tokens = inp_line.split()
+            if '"' in inp_line:
+                inp_tokens = concat_quoted_vals(inp_tokens)
+            yield ('row', inp_tokens)
 
 
-def extract_sections_from_text(
-    inp_text,
-    text_limits,
-    section_key
-):
+def extract_sections_from_inp(inp_lines):
     """
-    extracts sections from inp_text
-    :param str inp_text
-    :param dict text_limits: line numbers at beginning and end sections
-    :param str section_key 
-    :return: dict
-    """
-    section_text = inp_text[text_limits[0]+1:text_limits[1]]
-    # find descriptions
-    section_len = len(section_text)
-    annotations_list = [i for i, x in enumerate(section_text) if x.startswith(';')]
-    annot_starts = [i for i in annotations_list if i-1 not in annotations_list]
-    annot_ends = [i for i in annotations_list if i+1 not in annotations_list]
-    annot_result_list = [get_annotations(section_text, s, e, section_len) for s, e in zip(annot_starts, annot_ends)]
-    annot_dict = {i[0]: i[1] for i in annot_result_list if i is not None}
-    # exclude empty comments
-    annot_dict = {k: v for k, v in annot_dict.items() if len(v) > 0}
-    section_text = [x for x in section_text if not x.startswith(';')]  # delete annotations / descriptions
-    section_vals = [x.split() for x in section_text]
-    section_vals_clean = [concat_quoted_vals(x) for x in section_vals]
-    inp_extracted = {
-        'data': section_vals_clean,
-        'status': ImportDataStatus.RAW,
-        'annotations': annot_dict,
-        'n_objects': len(section_vals_clean)
-    }
-    return inp_extracted
+    extracts all known sections from the lines of an input file;
+    annotations are assigned to the following object in the section
+    :param iterable inp_lines
+    :return: tuple (dict, list): raw data for every section, unknown section headers
+    """
+    dict_all_vals = {}
+    unknown_sections = []
+    section_dict = None  # None before the first section and in unknown sections
+    annot_lines = []
+    for record_type, record in tokenize_inp_lines(inp_lines):
+        if record_type == 'section':
+            annot_lines = []
+            section_key = record[1:-1].upper()
+            if section_key in def_sections_dict.keys():
+                if section_key not in dict_all_vals.keys():
+                    dict_all_vals[section_key] = {
+                        'data': [],
+                        'status': ImportDataStatus.RAW,
+                        'annotations': {},
+                        'n_objects': 0
+                    }
+                section_dict = dict_all_vals[section_key]
+            else:
+                unknown_sections.append(record)
+                section_dict = None
+        elif section_dict is None:
+            pass
+        elif record_type == 'annotation':
+            annot_lines.append(record)
+        else:
+            if len(annot_lines) > 0:
+                annot_text = ' '.join(annot_lines)
+                if len(annot_text) > 0:  # exclude empty comments
+                    section_dict['annotations'][record[0]] = annot_text
+                annot_lines = []
+            section_dict['data'].append(record)
+    for section_dict in dict_all_vals.values():
+        section_dict['n_objects'] = len(section_dict['data'])
+    return dict_all_vals, unknown_sections
 
 
 def build_df_for_section(section_name, dict_all_raw_vals, with_annot=False):
@@ -450,99 +693,125 @@ def build_df_for_section(section_name, dict_all_raw_vals, with_annot=False):
 
 
 # adjustments in data
-def del_kw_from_list(data_list, kw, pos):
+def get_value_pair_positions(vals_mask, line_names, section_name):
     """
-    deletes elem from list at pos if elem in kw or elem==kw
-    :param list data_list
-    :param str kw: Keyword which shall be deleted
-    :param int pos: expected position of keyword
-    :return: list
+    finds the value pairs (e.g. X-Y or time-value) in lines with one
+    or more pairs; the pairs are returned in the order of the input file
+    :param np.ndarray vals_mask: True at the positions of the paired values
+    :param np.ndarray line_names: names of the lines for error messages
+    :param str section_name
+    :return: tuple (np.ndarray line index, np.ndarray first position, np.ndarray second position)
     """
-    if type(kw) == list:
-        kw_upper = [k.upper() for k in kw]
-        kw_list = kw + kw_upper
-    else:
-        kw_list = [kw, kw.upper()]
-    if data_list[pos] in kw_list:
-        data_list.pop(pos)
-    return data_list
+    val_rows, val_cols = np.nonzero(vals_mask)  # row by row
+    line_starts = np.flatnonzero(np.r_[True, np.diff(val_rows) != 0])
+    line_counts = np.diff(np.r_[line_starts, len(val_rows)])
+    if np.any(line_counts % 2 != 0):
+        odd_line = val_rows[line_starts[np.argmax(line_counts % 2 != 0)]]
+        raise QgsProcessingException(
+            'Incomplete value pair in section '
+            + section_name
+            + ' (line of \"'
+            + str(line_names[odd_line])
+            + '\")'
+        )
+    pos_in_line = np.arange(len(val_rows)) - np.repeat(line_starts, line_counts)
+    first_vals = np.flatnonzero(pos_in_line % 2 == 0)
+    return val_rows[first_vals], val_cols[first_vals], val_cols[first_vals + 1]
 
 
-def adjust_line_length(
-    ts_line,
-    pos,
-    line_length,
-    insert_val=[np.nan]
-):
+# dtype adjustment
+def dates_conversion(date_col):
     """
-    adds insert_val at pos in line lengt is not line length
-    :param list ts_line
-    :param int pos: position in the list for the fill
-    :param int line_length: expected line length
-    :param list insert_val: values to insert at pos if the list is too short
-    :return: list
+    converts a column of date strings ('MM/dd/yyyy') into QDates;
+    the distinct strings are parsed at once and every date is created only once
+    :param pd.Series date_col
+    :return: np.ndarray
     """
-    if len(ts_line) < line_length:
-        ts_line[pos:pos] = insert_val
-        return ts_line
-    else:
-        return ts_line
-
-
-def insert_nan_after_kw(df_line, kw_position, kw, insert_positions):
+    codes, uniques = pd.factorize(date_col)
+    parsed_dates = pd.to_datetime(
+        pd.Series(uniques, dtype=object),
+        format='%m/%d/%Y',
+        errors='coerce'
+    )
+    converted = [
+        NULL if pd.isna(d) else QDate(d.year, d.month, d.day) for d in parsed_dates
+    ] + [NULL]  # for missing values (code -1)
+    return np.array(converted, dtype=object)[codes]
+
+
+def times_conversion(time_col):
     """
-    adds np.nan after keyword (kw)
-    :param list df_line
-    :param int kw_position: expected position of keyword
-    :param str kw: Keyword
-    :param list insert_positions: position at which np.nan should be insertet
-    :return: list
+    converts a column of time strings ('H', 'H:mm' or 'H:mm:ss') into QTimes;
+    the distinct strings are split at once and every time is created only once
+    :param pd.Series time_col
+    :return: np.ndarray
     """
-    if df_line[kw_position] == kw:
-        for i_p in insert_positions:
-            df_line.insert(i_p, np.nan)
-    return df_line
+    codes, uniques = pd.factorize(time_col)
+    time_parts = pd.Series(uniques, dtype=object).astype(str).str.split(':', expand=True)
+    time_parts = time_parts.reindex(columns=range(3)).fillna('0').astype(int)
+    converted = [
+        QTime(h, m, sec) for h, m, sec in zip(
+            time_parts[0].tolist(),
+            time_parts[1].tolist(),
+            time_parts[2].tolist()
+        )
+    ] + [NULL]  # for missing values (code -1)
+    return np.array(converted, dtype=object)[codes]
 
-# dtype adjustment
-def date_conversion(datestring):
-    """
-    Converts a value into a QDate
-    :param str datestring
-    :return: QDate
-    """
-    if pd.isna(datestring):
-        return NULL
-    else:
-        return QDate().fromString(datestring, 'MM/dd/yyyy')
 
-def time_conversion(timestring):
+def get_timeseries_from_inp(ts_vals):
     """
-    Converts a string with a time information into a QTime
-    :param str timestring
-    :return: QTime
+    builds the TIMESERIES table from the lines of the input file;
+    lines may be [Name, Date, Time, Value], [Name, Time, Value]
+    or [Name, FILE, File_Name]; lines with several (Date,) Time, Value
+    entries are split into one row per entry
+    :param list ts_vals
+    :return: pd.DataFrame
     """
-    if pd.isna(timestring):
-        return NULL
-    else:
-        time_hours = '0'
-        time_minutes = '0'
-        time_seconds = '0'
-        time_elem_list = timestring.split(':')
-        if len(time_elem_list) == 1:
-            time_hours = time_elem_list[0]
-        elif len(time_elem_list) == 2:
-            time_hours = time_elem_list[0]
-            time_minutes = time_elem_list[1]
-        elif len(time_elem_list) == 3:
-            time_hours = time_elem_list[0]
-            time_minutes = time_elem_list[1]
-            time_seconds = time_elem_list[2]
-        else:
-            pass  # maybe a warning could be useful, here
-        time_hours = int(time_hours)
-        time_minutes = int(time_minutes)
-        time_seconds = int(time_seconds)
-    return QTime(time_hours, time_minutes, time_seconds)
+    ts_cols_dict = def_tables_dict['TIMESERIES']['tables']['TIMESERIES']
+    ts_raw = pd.DataFrame(ts_vals)
+    ts_raw = ts_raw.reindex(columns=range(max(3, len(ts_raw.columns))))  # File_Name for FILE lines
+    ts_arr = ts_raw.to_numpy(dtype=object)
+    file_rows = (ts_raw[1].astype(str).str.upper() == 'FILE').to_numpy()
+    # dates ('MM/dd/yyyy') are recognized by the slash
+    is_date = np.column_stack([
+        ts_raw[col].astype(str).str.contains('/', regex=False).to_numpy() for col in ts_raw.columns
+    ]) & ts_raw.notna().to_numpy()
+    is_date[:, 0] = False
+    ts_vals_mask = ts_raw.notna().to_numpy() & ~is_date
+    ts_vals_mask[:, 0] = False
+    ts_vals_mask[file_rows, :] = False
+    pair_rows, time_cols, value_cols = get_value_pair_positions(
+        ts_vals_mask,
+        ts_arr[:, 0],
+        'TIMESERIES'
+    )
+    # a date is valid for the time directly after it
+    pair_dates = np.where(is_date[pair_rows, time_cols - 1], ts_arr[pair_rows, time_cols - 1], np.nan)
+    file_rows_idx = np.flatnonzero(file_rows)
+    all_time_series = pd.concat([
+        pd.DataFrame({
+            'Name': ts_arr[pair_rows, 0],
+            'Date': pair_dates,
+            'Time': ts_arr[pair_rows, time_cols],
+            'Value': ts_arr[pair_rows, value_cols],
+            'File_Name': np.nan,
+            'line': pair_rows
+        }),
+        pd.DataFrame({
+            'Name': ts_arr[file_rows_idx, 0],
+            'Date': np.nan,
+            'Time': np.nan,
+            'Value': np.nan,
+            'File_Name': ts_arr[file_rows_idx, 2],
+            'line': file_rows_idx
+        })
+    ], ignore_index=True)
+    # in the order of the input file
+    all_time_series = all_time_series.sort_values('line', kind='stable')
+    all_time_series = all_time_series.drop(columns='line').reset_index(drop=True)
+    return adjust_column_types(all_time_series, ts_cols_dict)
+
 
 def adjust_column_types(df, col_types):
     """
@@ -555,17 +824,17 @@ def adjust_column_types(df, col_types):
         """applies the type conversion on a column"""
         col = col.replace('*', np.nan)  # eventuell mit liste?
         if col_types[col.name] == 'String':
-            return [str(x) if not pd.isna(x) else x for x in col]
+            return col.astype(object).map(str, na_action='ignore')
         if col_types[col.name] == 'Int':
             return [int(x) if not pd.isna(x) else x for x in col]
         if col_types[col.name] == 'Double':
-            return [float(x) if not pd.isna(x) else x for x in col]
+            return col.astype(float)
         if col_types[col.name] == 'Bool':
             return [bool(x) if not pd.isna(x) else x for x in col]
         if col_types[col.name] == 'Date':
-            return [date_conversion(x) for x in col]
+            return dates_conversion(col)
         if col_types[col.name] == 'Time':
-            return [time_conversion(x) for x in col]
+            return times_conversion(col)
     df = df.apply(col_conversion, axis=0)
     return df
 
@@ -578,6 +847,7 @@ def add_layer_on_completion(
     pluginPath,
     context,
     layer_color=None,
+    all_in_one_gpkg=None,
     **kwargs
 ):
     """
@@ -589,11 +859,15 @@ def add_layer_on_completion(
     :param str pluginPath
     :param QgsProcessingContext context
     :param str layer_color
+    :param str all_in_one_gpkg: path of the GeoPackage with all layers (optional)
     """
-    layer_filename = layer_name+'.'+geodata_driver_extension
-    file_path = os.path.join(folder_save, layer_filename)
+    if all_in_one_gpkg is not None:
+        file_path = all_in_one_gpkg
+    else:
+        layer_filename = layer_name+'.'+geodata_driver_extension
+        file_path = os.path.join(folder_save, layer_filename)
     if os.path.isfile(file_path):
-        if geodata_driver_extension in ['gpkg', 'fgb', 'gml', 'kml']:
+        if all_in_one_gpkg is not None or geodata_driver_extension in ['gpkg', 'fgb', 'gml', 'kml']:
             file_path = file_path+'|layername='+layer_name
         vlayer = QgsVectorLayer(
             file_path,
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ GenerateSwmmInp
+                                 A QGIS plugin
+ This plugin generates SWMM Input files
+ Generated by Plugin Builder: http://g-sherman.github.io/Qgis-Plugin-Builder/
+                              -------------------
+        begin                : 2021-07-09
+        copyright            : (C) 2021 by Jannik Schilling
+        email                : jannik.schilling@posteo.de
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+__author__ = 'Jannik Schilling'
+__date__ = '2024-04-24'
+__copyright__ = '(C) 2021 by Jannik Schilling'
+
+from functools import lru_cache
+import pandas as pd
+import numpy as np
+from .g_s_defaults import (
+    annotation_field_name,
+    def_qgis_fields_dict,
+    def_sections_dict
+)
+from .g_s_nodes import st_types_def
+from .g_s_links import inl_types_def
+
+
+def interval_to_hh_mm(interval_col):
+    """
+    converts rain gage intervals into HH:mm, e.g. '1' -> '01:00', '0:15' -> '00:15'
+    :param pd.Series interval_col
+    :return: pd.Series
+    """
+    interval_split = interval_col.astype(str).str.split(':', expand=True)
+    interval_split = interval_split.reindex(columns=[0, 1])
+    hours = interval_split[0].str.zfill(2)  # if one digit hour
+    minutes = interval_split[1].fillna('00')  # if only hours
+    return hours + ':' + minutes
+
+
+# Layouts of sections with a variable number of values per line.
+# 'columns': columns of the resulting table
+# 'type_position': position of the keyword which defines the layout of a line
+# 'layouts': column name of every value in a line (None: value is skipped);
+#     lines with other keywords are read in the order of 'columns'
+# 'converters': functions for single columns (pd.Series -> pd.Series)
+# new variants of a section can be added here
+st_head = ['Name', 'Elevation', 'MaxDepth', 'InitDepth', 'Type']
+st_seepage = ['SurDepth', 'Fevap', 'Psi', 'Ksat', 'IMD']
+div_head = ['Name', 'Elevation', 'DivertLink', 'Type']
+div_tail = ['MaxDepth', 'InitDepth', 'SurDepth', 'Aponded']
+outl_tabular = ['Name', 'FromNode', 'ToNode', 'InOffset', 'RateCurve', 'CurveName', 'FlapGate']
+def_inp_layouts_dict = {
+    'RAINGAGES': {
+        'columns': list(def_qgis_fields_dict['RAINGAGES'].keys()),
+        'type_position': 4,
+        'layouts': {
+            'TIMESERIES': ['Name', 'Format', 'Interval', 'SCF', 'DataSource', 'SeriesName'],
+            'FILE': ['Name', 'Format', 'Interval', 'SCF', 'DataSource', 'FileName', 'StationID', 'RainUnits']
+        },
+        'converters': {'Interval': interval_to_hh_mm}
+    },
+    'OUTFALLS': {
+        'columns': def_sections_dict['OUTFALLS'],
+        'type_position': 2,
+        'layouts': {
+            'FREE': ['Name', 'Elevation', 'Type', 'FlapGate', 'RouteTo'],
+            'NORMAL': ['Name', 'Elevation', 'Type', 'FlapGate', 'RouteTo'],
+            'FIXED': ['Name', 'Elevation', 'Type', 'FixedStage', 'FlapGate', 'RouteTo'],
+            'TIDAL': ['Name', 'Elevation', 'Type', 'Curve_TS', 'FlapGate', 'RouteTo'],
+            'TIMESERIES': ['Name', 'Elevation', 'Type', 'Curve_TS', 'FlapGate', 'RouteTo']
+        }
+    },
+    'DIVIDERS': {
+        'columns': def_sections_dict['DIVIDERS'],
+        'type_position': 3,
+        'layouts': {
+            'OVERFLOW': div_head + div_tail,
+            'CUTOFF': div_head + ['CutoffFlow'] + div_tail,
+            'TABULAR': div_head + ['Curve'] + div_tail,
+            'WEIR': div_head + ['WeirMinFlo', 'WeirMaxDep', 'WeirCoeff'] + div_tail
+        }
+    },
+    'STORAGE': {
+        'columns': def_sections_dict['STORAGE'],
+        'type_position': 4,
+        'layouts': {
+            # shape parameters take three values, a storage curve only one
+            st_type: st_head + st_cols + ([] if st_type == 'TABULAR' else [None] * (3 - len(st_cols))) + st_seepage
+            for st_type, st_cols in st_types_def.items()
+        }
+    },
+    'OUTLETS': {
+        'columns': def_sections_dict['OUTLETS'],
+        'type_position': 4,
+        'layouts': {
+            'TABULAR/DEPTH': outl_tabular,
+            'TABULAR/HEAD': outl_tabular
+        }
+    },
+    'INLETS': {
+        'columns': def_sections_dict['INLETS'],
+        'type_position': 1,
+        'layouts': {
+            # GENERIC grates have two more values
+            inl_type: ['Name', 'Type'] + inl_cols + (['OpenFract', 'SplashVel'] if 'Shape' in inl_cols else [])
+            for inl_type, inl_cols in inl_types_def.items()
+        }
+    }
+}
+
+
+@lru_cache(maxsize=None)
+def get_layout_positions(section_name):
+    """
+    compiles the layouts of a section into the value positions of every column;
+    -1 if a column is not part of the layout
+    :param str section_name
+    :return: tuple (np.array default positions, dict of np.arrays by keyword)
+    """
+    layout_def = def_inp_layouts_dict[section_name]
+    columns = layout_def['columns']
+    default_positions = np.arange(len(columns))
+    kw_positions = {}
+    for kw, kw_layout in layout_def['layouts'].items():
+        col_pos = {col: i for i, col in enumerate(kw_layout) if col is not None}
+        kw_positions[kw] = np.array([col_pos.get(col, -1) for col in columns])
+    return default_positions, kw_positions
+
+
+def build_df_by_layout(section_name, data_dict, with_annot=False):
+    """
+    builds the dataframe of a section with variable line layouts
+    by selecting the values of all lines at once
+    :param str section_name
+    :param dict data_dict
+    :param bool with_annot: indicates if an annotations column will be added
+    :return: pd.DataFrame
+    """
+    layout_def = def_inp_layouts_dict[section_name]
+    columns = layout_def['columns']
+    if data_dict['n_objects'] == 0:
+        col_names = columns + [annotation_field_name] if with_annot else columns
+        return pd.DataFrame(columns=col_names)
+    default_positions, kw_positions = get_layout_positions(section_name)
+    tokens = pd.DataFrame(data_dict['data'])
+    n_lines, n_tokens = tokens.shape
+    # last column for missing values
+    token_arr = np.empty((n_lines, n_tokens + 1), dtype=object)
+    token_arr[:, :n_tokens] = tokens.to_numpy(dtype=object)
+    token_arr[:, n_tokens] = np.nan
+    pos_idx = np.tile(default_positions, (n_lines, 1))
+    type_position = layout_def['type_position']
+    if type_position < n_tokens:
+        keywords = tokens[type_position]
+        for kw, positions in kw_positions.items():
+            pos_idx[(keywords == kw).to_numpy()] = positions
+    pos_idx[(pos_idx < 0) | (pos_idx >= n_tokens)] = n_tokens
+    df = pd.DataFrame(
+        token_arr[np.arange(n_lines)[:, None], pos_idx],
+        columns=columns
+    )
+    df = df.fillna(np.nan)  # None in short lines
+    for col, col_converter in layout_def.get('converters', {}).items():
+        df[col] = col_converter(df[col])
+    if with_annot:
+        df[annotation_field_name] = df['Name'].map(data_dict['annotations'])
+    return df
@@ -29,7 +29,8 @@ import numpy as np
 from qgis.core import (
     NULL,
     QgsProcessingException,
-    QgsGeometry
+    QgsGeometry,
+    QgsLineString
 )
 from .g_s_defaults import (
     def_qgis_fields_dict,
@@ -38,6 +39,12 @@ from .g_s_defaults import (
 from .g_s_export_helpers import (
     check_columns
 )
+from .g_s_nodes import (
+    elevations_to_float,
+    gather_vertex_slices,
+    get_node_elevations,
+    group_vertices_by_name
+)
 
 
 # Definitions
@@ -314,27 +321,89 @@ def get_transects_from_table(transects_raw):
 
 
 # Import
-# Inlets
-def get_inlet_from_inp(inlets_raw_line):
+# Transects
+def get_transects_from_inp(transects_lines, feedback):
     """
-    converts an inlet string into a list of inlet values
-    :param list inlets_raw_line
-    :return: list
+    streaming parser for transects in HEC-2 format (NC, X1 and GR records);
+    the array sizes are counted first, then the values are written
+    directly into preallocated arrays
+    :param list transects_lines
+    :param QgsProcessingFeedback feedback
+    :return: tuple (pd.DataFrame, pd.DataFrame): transect data, station points
     """
-    init_elems = inlets_raw_line[:2]
-    inl_type_i = inlets_raw_line[1]
-    inl_cols_i = inl_types_def[inl_type_i]
-    inl_vals_i = {col: inlets_raw_line[2+i] for i, col in enumerate(inl_cols_i)}
-    inl_missing = {col_0: np.nan for col_0 in all_inl_type_cols if col_0 not in inl_vals_i.keys()}
-    inl_vals_i.update(inl_missing)
-    # adjustment for generec shapes
-    if inl_vals_i['Shape'] == 'GENERIC':
-        inl_vals_i['OpenFract'] = inlets_raw_line[5]
-        inl_vals_i['OpenFract'] = inlets_raw_line[6]
-    type_elems = [inl_vals_i[t_c] for t_c in all_inl_type_cols]
-    # resulting line
-    inl_line_adjusted = init_elems + type_elems
-    return (inl_line_adjusted)
+    # first pass: number of transects and station points
+    n_points_tr = np.array(
+        [int(float(x[2])) for x in transects_lines if x[0] == 'X1'],
+        dtype=np.int64
+    )
+    n_trans = len(n_points_tr)
+    tr_names = np.empty(n_trans, dtype=object)
+    # roughness (left, right, channel), bank stations (left, right),
+    # modifiers (meander, stations, elevations)
+    tr_values = np.full((n_trans, 8), np.nan)
+    gr_values = np.full(int(n_points_tr.sum()) * 2, np.nan)  # pairs of elevation and station
+    gr_ends = np.cumsum(n_points_tr * 2)
+    # second pass
+    tr_roughness = [np.nan, np.nan, np.nan]  # NC is valid until the next NC record
+    i_tr = -1
+    i_gr = 0
+    for tr_line in transects_lines:
+        if tr_line[0] == 'NC':
+            tr_roughness = [float(x) for x in tr_line[1:4]]
+        elif tr_line[0] == 'X1':
+            if feedback.isCanceled():
+                break
+            i_tr += 1
+            if i_tr > 0:
+                i_gr = gr_ends[i_tr-1]
+            tr_names[i_tr] = tr_line[1]
+            tr_values[i_tr, 0:len(tr_roughness)] = tr_roughness
+            tr_values[i_tr, 3:5] = [float(tr_line[3]), float(tr_line[4])]
+            tr_modifier = [float(x) for x in tr_line[7:10]]
+            tr_values[i_tr, 5:5+len(tr_modifier)] = tr_modifier
+            if i_tr % 1000 == 0:
+                feedback.setProgress((i_tr/n_trans)*90)
+        elif tr_line[0] == 'GR' and i_tr >= 0:
+            gr_line = tr_line[1:gr_ends[i_tr]-i_gr+1]  # values beyond the X1 count are ignored
+            gr_values[i_gr:i_gr+len(gr_line)] = gr_line
+            i_gr += len(gr_line)
+    if i_tr + 1 < n_trans:  # canceled: only complete transects
+        n_trans = i_tr + 1
+        tr_names = tr_names[:n_trans]
+        tr_values = tr_values[:n_trans]
+        n_points_tr = n_points_tr[:n_trans]
+        gr_values = gr_values[:int(n_points_tr.sum()) * 2]
+    all_tr_dats_df = pd.DataFrame(
+        tr_values,
+        columns=[
+            'RoughnessLeftBank',
+            'RoughnessRightBank',
+            'RoughnessChannel',
+            'BankStationLeft',
+            'BankStationRight',
+            'ModifierMeander',
+            'ModifierStations',
+            'ModifierElevations'
+        ]
+    )
+    all_tr_dats_df.insert(0, 'TransectName', tr_names)
+    all_tr_dats_df = all_tr_dats_df[[
+        'TransectName',
+        'RoughnessLeftBank',
+        'RoughnessRightBank',
+        'RoughnessChannel',
+        'BankStationLeft',
+        'BankStationRight',
+        'ModifierStations',
+        'ModifierElevations',
+        'ModifierMeander'
+    ]]  # order of columns according to swmm interface
+    all_tr_vals_df = pd.DataFrame({
+        'TransectName': np.repeat(tr_names, n_points_tr),
+        'Station': gr_values[1::2],
+        'Elevation': gr_values[0::2]
+    })  # order of columns according to swmm interface
+    return all_tr_dats_df, all_tr_vals_df
 
 
 # xsections
@@ -354,127 +423,132 @@ def adjust_xsection_df(all_xsections):  # no feedback!
     return all_xsections
 
 
-# outlets
-def adjust_outlets_list(outl_list_i, feedback):
-    """
-    adds two np.nan if outlets is type TABULAR
-    :param list outl_list_i
-    :param QgsProcessingFeedback feedback
-    """
-    if outl_list_i[4].startswith('TABULAR'):
-        curve_name = outl_list_i[5]
-        flap_gate = outl_list_i[6]
-        outl_list_i[:5]
-        return outl_list_i[:5]+[np.nan, np.nan]+[flap_gate, curve_name]
-    else:
-        return outl_list_i+[np.nan]
-
-
 # geometry
-def get_line_from_points(
-    line_name,
-    from_node,
-    to_node,
-    dict_all_vals
+def create_lines_for_section(
+    df_processed,
+    dict_all_vals,
+    feedback,
+    link_offsets=None,
+    node_elevations=None
 ):
     """
-    :param str line_name
-    :param str from_node
-    :param str to_node
-    :param dict dict_all_vals
-    :return: list
-    """
-    all_geoms = dict_all_vals['COORDINATES']['data']
-    all_vertices = dict_all_vals['VERTICES']['data']
-    if (
-        (from_node not in all_geoms.index)
-        or (to_node not in all_geoms.index)
-    ):  # skip if not connected
-        line_geom = NULL
-    else:
-        verts = all_vertices[all_vertices.index == line_name]
-        if len(verts) > 0:
-            l_verts = verts.reset_index(drop=True)
-            l_verts_points = [x.asPoint() for x in l_verts['geometry']]
-        else:
-            l_verts_points = []
-        from_geom = all_geoms.loc[from_node, 'geometry']
-        from_point = from_geom.asPoint()
-        to_geom = all_geoms.loc[to_node, 'geometry']
-        to_point = to_geom.asPoint()
-        l_all_verts = [from_point]+l_verts_points+[to_point]
-        line_geom = QgsGeometry.fromPolylineXY(l_all_verts)
-    return [line_name, line_geom]
-
-
-def create_lines_for_section(df_processed, dict_all_vals, feedback):
-    """
-    converts a point x-y-list into POINT-df
+    creates the line geometries for all links of a section from the
+    node coordinates and the (grouped) vertices;
+    links with missing node coordinates get NULL geometries
     :param pd.DataFrame df_processed
     :param dict dict_all_vals
     :param QgsProcessingFeedback feedback
+    :param str link_offsets: 'elevation' or 'depth'; if given, z coordinates
+        are interpolated between the elevations at the ends of the links
+    :param pd.Series node_elevations: elevation by node name (optional)
     :return: pd.DataFrame
     """
-    lines_created = [
-        get_line_from_points(n, f, t, dict_all_vals) for n, f, t in zip(
-            df_processed['Name'],
-            df_processed['FromNode'],
-            df_processed['ToNode']
+    all_coords = dict_all_vals['COORDINATES']['data']
+    all_coords = all_coords[~all_coords.index.duplicated()]
+    verts_offsets, verts_x, verts_y = group_vertices_by_name(
+        dict_all_vals['VERTICES']['data']
+    )
+    line_names = df_processed['Name'].to_numpy()
+    line_geoms = np.full(len(line_names), NULL, dtype=object)
+    from_coords = all_coords.reindex(df_processed['FromNode']).to_numpy(dtype=np.float64)
+    to_coords = all_coords.reindex(df_processed['ToNode']).to_numpy(dtype=np.float64)
+    is_connected = ~(
+        np.isnan(from_coords).any(axis=1) | np.isnan(to_coords).any(axis=1)
+    )  # skip if not connected
+    if is_connected.any():
+        from_coords = from_coords[is_connected]
+        to_coords = to_coords[is_connected]
+        verts_sel = verts_offsets.reindex(line_names[is_connected])
+        verts_start = verts_sel['start'].fillna(0).to_numpy(dtype=np.int64)
+        verts_count = verts_sel['count'].fillna(0).to_numpy(dtype=np.int64)
+        # from node, vertices, to node in one contiguous array per coordinate
+        line_len = verts_count + 2
+        line_start = np.cumsum(line_len) - line_len
+        verts_src = gather_vertex_slices(verts_start, verts_count)
+        verts_dst = gather_vertex_slices(line_start + 1, verts_count)
+        lines_x = np.empty(line_len.sum(), dtype=np.float64)
+        lines_y = np.empty(line_len.sum(), dtype=np.float64)
+        lines_x[line_start] = from_coords[:, 0]
+        lines_y[line_start] = from_coords[:, 1]
+        lines_x[verts_dst] = verts_x[verts_src]
+        lines_y[verts_dst] = verts_y[verts_src]
+        lines_x[line_start + line_len - 1] = to_coords[:, 0]
+        lines_y[line_start + line_len - 1] = to_coords[:, 1]
+        feedback.setProgress(50)
+        split_pos = line_start[1:]
+        if link_offsets is None:
+            line_geoms[is_connected] = [
+                QgsGeometry(QgsLineString(x_l.tolist(), y_l.tolist())) for x_l, y_l in zip(
+                    np.split(lines_x, split_pos),
+                    np.split(lines_y, split_pos)
+                )
+            ]
+        else:
+            if node_elevations is None:
+                node_elevations = get_node_elevations(dict_all_vals)
+            lines_z = get_z_for_lines(
+                df_processed[is_connected],
+                node_elevations,
+                lines_x,
+                lines_y,
+                line_start,
+                line_len,
+                link_offsets
             )
-    ]
+            line_geoms[is_connected] = [
+                QgsGeometry(
+                    QgsLineString(x_l.tolist(), y_l.tolist(), z_l.tolist())
+                ) for x_l, y_l, z_l in zip(
+                    np.split(lines_x, split_pos),
+                    np.split(lines_y, split_pos),
+                    np.split(lines_z, split_pos)
+                )
+            ]
     lines_created = pd.DataFrame(
-        lines_created,
-        columns=['Name', 'geometry']
+        {'Name': line_names, 'geometry': line_geoms}
     ).set_index('Name')
     return lines_created
 
 
-
 # z coordinates
-def get_elevation_from_node(node_name, dict_all_vals):
-    for section_i in ['JUNCTIONS', 'OUTFALLS', 'DIVIDERS', 'STORAGE']:
-        if section_i in dict_all_vals.keys():
-            if node_name in dict_all_vals[section_i]['data']['Name'].values:
-                matching_df = dict_all_vals[section_i]['data']
-                z_coord = matching_df.loc[matching_df['Name']==node_name, 'Elevation'].tolist()[0]
-                z_coord = float(z_coord)
-                break
-    return z_coord
-
-def add_z_to_lines(sr, import_parameters_dict, dict_all_vals):
+def get_z_for_lines(
+    links_df,
+    node_elevations,
+    lines_x,
+    lines_y,
+    line_start,
+    line_len,
+    link_offsets
+):
     """
-    Adds a z coordindate to the line geometry in a pandas series
-    :param PandasSeries sr
+    interpolates z coordinates for all vertices of the links along the
+    cumulative segment lengths
+    :param pd.DataFrame links_df
+    :param pd.Series node_elevations: elevation by node name
+    :param np.ndarray lines_x: contiguous x coordinates of all links
+    :param np.ndarray lines_y: contiguous y coordinates of all links
+    :param np.ndarray line_start: position of the first vertex of each link
+    :param np.ndarray line_len: number of vertices of each link
+    :param str link_offsets: 'elevation' or 'depth'
+    :return: np.ndarray
     """
-    f_geometry = sr['geometry']
-    in_offset = sr['InOffset']
-    out_offset = sr['OutOffset']
-    vtc = [v for v in f_geometry.vertices()]
-    # get the elevation
-    from_node = sr['FromNode']
-    z_coord_first = get_elevation_from_node(from_node, dict_all_vals)
-    to_node = sr['ToNode']
-    z_coord_last = get_elevation_from_node(to_node, dict_all_vals)
-    if import_parameters_dict['link_offsets'] == 'elevation':
-        # absolute elevations -> replace with in_offset if available
-        if in_offset != NULL:
-            z_coord_first = float(in_offset)
-        if out_offset != NULL:
-            z_coord_last = float(out_offset)
+    z_first = node_elevations.reindex(links_df['FromNode']).to_numpy(dtype=np.float64)
+    z_last = node_elevations.reindex(links_df['ToNode']).to_numpy(dtype=np.float64)
+    in_offset = elevations_to_float(links_df['InOffset'])
+    out_offset = elevations_to_float(links_df['OutOffset'])
+    if link_offsets == 'elevation':
+        # absolute elevations -> replace with offset if available
+        z_first = np.where(np.isnan(in_offset), z_first, in_offset)
+        z_last = np.where(np.isnan(out_offset), z_last, out_offset)
     else:
         # depth / relative heights -> add offset to z_coord
-        if in_offset != NULL:
-            z_coord_first = z_coord_first + float(in_offset)
-        if out_offset != NULL:
-            z_coord_last = z_coord_last + float(out_offset)
-    z_diff = z_coord_last-z_coord_first
-    len_line = f_geometry.length()
-    slope = z_diff/len_line
-    vtx_list = []
-    for i, vert in enumerate(f_geometry.vertices()):
-        dist = f_geometry.distanceToVertex(i)
-        z_interpol = z_coord_first + dist*slope
-        vert.addZValue(z_interpol)
-        vtx_list.append(vert)
-    f_geometry_with_z = QgsGeometry.fromPolyline(vtx_list)
-    return f_geometry_with_z
+        z_first = z_first + np.nan_to_num(in_offset)
+        z_last = z_last + np.nan_to_num(out_offset)
+    # distance of every vertex from the start of its link
+    segm_len = np.hypot(np.diff(lines_x), np.diff(lines_y))
+    dist_all = np.concatenate([[0.0], np.cumsum(segm_len)])
+    dist = dist_all - np.repeat(dist_all[line_start], line_len)
+    len_line = dist[line_start + line_len - 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.where(len_line > 0, (z_last - z_first) / len_line, 0.0)
+    return np.repeat(z_first, line_len) + dist * np.repeat(slope, line_len)
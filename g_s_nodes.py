@@ -27,8 +27,13 @@ __copyright__ = '(C) 2021 by Jannik Schilling'
 import numpy as np
 import pandas as pd
 from qgis.core import (
+    NULL,
+    QgsCoordinateTransform,
     QgsProcessingException,
-    QgsGeometry
+    QgsGeometry,
+    QgsLineString,
+    QgsPoint,
+    QgsPointXY
 )
 from .g_s_defaults import (
     def_qgis_fields_dict,
@@ -318,143 +323,180 @@ def get_inflows_from_table(inflows_raw, all_nodes, feedback):
 
 # Import
 #-------
-# Outfalls
-def get_outfalls_from_inp(outfalls_line, feedback):
-    """
-    Prepares an outfall element
-    :param list outfalls_line
-    :param QgsProcessingFeedback feedback
-    :return: list
-    """
-    if outfalls_line[2] in ['FREE', 'NORMAL']:
-        outfalls_line.insert(3, np.nan)
-        outfalls_line.insert(4, np.nan)
-    if outfalls_line[2] == 'FIXED':
-        outfalls_line.insert(4, np.nan)
-    if outfalls_line[2] in ['TIDAL', 'TIMESERIES']:
-        outfalls_line.insert(3, np.nan)
-    return outfalls_line
-    
-# Dividers
-def get_dividers_from_inp(divider_line, feedback):
-    """
-    Prepares a divider element
-    :param list divider_line
-    :param QgsProcessingFeedback feedback
-    :return: list
-    """
-    if divider_line[3] == 'OVERFLOW':
-        for pos in [4, 5, 6, 7, 8]:
-            divider_line.insert(pos, np.nan)
-    if divider_line[3] == 'CUTOFF':
-        for pos in [5, 6, 7, 8]:
-            divider_line.insert(pos, np.nan)
-    if divider_line[3] == 'TABULAR':
-        for pos in [4, 6, 7, 8]:
-            divider_line.insert(pos, np.nan)
-    if divider_line[3] == 'WEIR':
-        for pos in [4, 5]:
-            divider_line.insert(pos, np.nan)
-    return divider_line
-
-# Storage
-def get_storages_from_inp(st_raw_line, feedback):
-    """
-    adjusts the inp line according to the storage type
-    :param list st_raw_line
-    :param QgsProcessingFeedback feedback
-    :return: list
-    """
-    init_elems = st_raw_line[:5]
-    st_type_i = st_raw_line[4]
-    st_cols_i = st_types_def[st_type_i]
-    st_vals_i = {col: st_raw_line[5+i] for i, col in enumerate(st_cols_i)}
-    st_missing = {col_0: np.nan for col_0 in all_st_type_cols if col_0 not in st_vals_i.keys()}
-    st_vals_i.update(st_missing)
-    type_elems = [st_vals_i[t_c] for t_c in all_st_type_cols]
-    # Seepage and Evaporation loss
-    if st_type_i == 'TABULAR':
-        sur_elems = st_raw_line[6:]
-    else:
-        sur_elems = st_raw_line[8:]
-    if len(sur_elems) == 2:
-        sur_elems = sur_elems + [np.nan, np.nan, np.nan]
-    # resulting line
-    st_line_adjusted = init_elems + type_elems + sur_elems
-    return(st_line_adjusted)
-    
 # Hydrographs
-def get_hydrogrphs(hg_name, df_hydrographs_raw):
+def get_hydrographs_from_inp(df_hydrographs_raw):
     '''
-    creates a flat hydrograph df
-    :param str hg_name
+    creates the flat hydrograph table (one row per hydrograph and month
+    with short, medium and long term parameters) with one pivot
     :param pd.DataFrame df_hydrographs_raw
     :return: pd.DataFrame
     '''
-    subdf = df_hydrographs_raw[df_hydrographs_raw['Name'] == hg_name]
-    hg_rg = subdf[pd.isna(subdf['Response'])]
-    hg_rg = hg_rg[['Name', 'RG_Month']].rename(columns={'RG_Month': 'Rain_Gage'})
-    for t in ['Short', 'Medium', 'Long']:
-        hg_i = subdf[subdf['Response'] == t]
-        if t == 'Short':
-            hg_rg['Months'] = list(hg_i['RG_Month'])[0]
-        hg_i = hg_i.drop(columns = ['RG_Month', 'Response'])
-        ren_dict = {c: c+'_'+t+'Term' for c in hg_i.columns if c != 'Name'}
-        hg_i = hg_i.rename(columns=ren_dict)
-        hg_rg = hg_rg.join(
-            hg_i.set_index('Name'),
-            on='Name'
-        )
-    return (hg_rg)
+    hg_cols = list(def_tables_dict['INFLOWS']['tables']['Hydrographs'].keys())
+    param_cols = ['R', 'T', 'K', 'D_max', 'D_recovery', 'D_init']
+    rg_rows = df_hydrographs_raw['Response'].isna()
+    hg_rg = df_hydrographs_raw.loc[rg_rows, ['Name', 'RG_Month']]
+    hg_rg = hg_rg.drop_duplicates(subset='Name').rename(columns={'RG_Month': 'Rain_Gage'})
+    hg_resp = df_hydrographs_raw.loc[~rg_rows, ['Name', 'RG_Month', 'Response'] + param_cols].copy()
+    hg_resp['Response'] = hg_resp['Response'].astype(str).str.capitalize() + 'Term'
+    hg_resp = hg_resp.drop_duplicates(subset=['Name', 'RG_Month', 'Response'])
+    # pivot sorts the index; months are kept in the order of the input file
+    hg_order = pd.MultiIndex.from_frame(hg_resp[['Name', 'RG_Month']]).unique()
+    hg_pivot = hg_resp.pivot(
+        index=['Name', 'RG_Month'],
+        columns='Response',
+        values=param_cols
+    ).reindex(hg_order)
+    # e.g. ('R', 'ShortTerm') -> 'R_ShortTerm'
+    hg_pivot.columns = [p + '_' + r for p, r in hg_pivot.columns]
+    hg_pivot = hg_pivot.reset_index().rename(columns={'RG_Month': 'Months'})
+    df_hydrographs = hg_rg.merge(hg_pivot, on='Name', how='left')
+    return df_hydrographs.reindex(columns=hg_cols).reset_index(drop=True)
 
 # Geometry helpers
-def create_point_from_x_y(sr, i, n, feedback):
+def create_points_df(data, feedback):
     """
-    converts x and y coordinates from a pd.Series to a QgsPoint geometry
-    :param pd.Series sr
-    :param int 1
-    :param int n: length of data
+    converts a point x-y-list into float coordinates indexed by name;
+    geometries are only created for the final features
+    :param pd.DataFrame data
     :param QgsProcessingFeedback feedback
-    :return: list
+    :return: pd.DataFrame
     """
-    x_coord = sr['X_Coord']
-    y_coord = sr['Y_Coord']
-    geom = QgsGeometry.fromWkt(
-        'POINT(' + str(x_coord) + ' '+str(y_coord) + ')'
+    df_out = pd.DataFrame(
+        {
+            'X_Coord': data['X_Coord'].to_numpy().astype(np.float64),
+            'Y_Coord': data['Y_Coord'].to_numpy().astype(np.float64)
+        },
+        index=pd.Index(data['Name'], name='Name')
     )
-    feedback.setProgress(((i+1)/n)*100)
-    if feedback.isCanceled():
-        pass
-    return [sr['Name'], geom]
+    feedback.setProgress(100)
+    return df_out
 
-def create_points_df(data, feedback):
+
+def transform_coords_df(coords_df, coord_transform):
     """
-    converts a point x-y-list into POINT-df
-    :param pd.DataFrame data
-    :param QgsProcessingFeedback feedback
+    transforms all coordinates of a DataFrame in one call
+    before any geometry is created
+    :param pd.DataFrame coords_df: float columns X_Coord and Y_Coord
+    :param QgsCoordinateTransform coord_transform
     :return: pd.DataFrame
     """
-    n = len(data)
-    if n > 0:
-        all_geoms = [create_point_from_x_y(
-            data.loc[i,],
-            i,
-            n,
-            feedback) for i in data.index] # point geometries
-        df_out = pd.DataFrame(all_geoms, columns=['Name', 'geometry']).set_index('Name')
+    coords_df = coords_df.copy()
+    coords_valid = coords_df['X_Coord'].notna() & coords_df['Y_Coord'].notna()
+    if coords_valid.any():
+        coord_transform = QgsCoordinateTransform(coord_transform)  # own copy for worker threads
+        # the coordinate arrays are transformed in bulk as one line string
+        coords_line = QgsLineString(
+            coords_df.loc[coords_valid, 'X_Coord'].tolist(),
+            coords_df.loc[coords_valid, 'Y_Coord'].tolist()
+        )
+        coords_line.transform(coord_transform)
+        coords_df.loc[coords_valid, 'X_Coord'] = np.asarray(coords_line.xVector(), dtype=np.float64)
+        coords_df.loc[coords_valid, 'Y_Coord'] = np.asarray(coords_line.yVector(), dtype=np.float64)
+    return coords_df
+
+
+def create_points_for_section(df_processed, coords_df, add_z=False):
+    """
+    creates the point geometries for all features of a section;
+    features without coordinates get NULL geometries
+    :param pd.DataFrame df_processed
+    :param pd.DataFrame coords_df: index 'Name', columns 'X_Coord', 'Y_Coord'
+    :param bool add_z: use the column 'Elevation' as z coordinate
+    :return: pd.DataFrame
+    """
+    coords_df = coords_df[~coords_df.index.duplicated()]
+    pts_coords = coords_df.reindex(df_processed['Name'])
+    x_coords = pts_coords['X_Coord'].to_numpy()
+    y_coords = pts_coords['Y_Coord'].to_numpy()
+    if add_z:
+        z_coords = elevations_to_float(df_processed['Elevation'])
+        pts_geoms = [
+            NULL if np.isnan(x_p) or np.isnan(y_p)
+            else QgsGeometry(QgsPoint(x_p, y_p, z_p))
+            for x_p, y_p, z_p in zip(x_coords, y_coords, z_coords)
+        ]
     else:
-        df_out = pd.DataFrame(columns = ['Name', 'geometry']).set_index('Name')
-    return df_out
+        pts_geoms = [
+            NULL if np.isnan(x_p) or np.isnan(y_p)
+            else QgsGeometry.fromPointXY(QgsPointXY(x_p, y_p))
+            for x_p, y_p in zip(x_coords, y_coords)
+        ]
+    points_created = pd.DataFrame(
+        {'Name': df_processed['Name'].to_numpy(), 'geometry': pts_geoms}
+    ).set_index('Name')
+    return points_created
+
+
+def group_vertices_by_name(vertices_df):
+    """
+    sorts the vertices of a geometry section (e.g. VERTICES, POLYGONS) by
+    object name in a single step; the order of vertices within an object is kept
+    :param pd.DataFrame vertices_df: index 'Name', columns 'X_Coord', 'Y_Coord'
+    :return: tuple (pd.DataFrame, np.ndarray, np.ndarray): start and count of
+        the vertices for every name, contiguous x and y coordinates
+    """
+    x_coords = vertices_df['X_Coord'].to_numpy(dtype=np.float64)
+    y_coords = vertices_df['Y_Coord'].to_numpy(dtype=np.float64)
+    name_codes, names = pd.factorize(vertices_df.index)
+    sort_order = np.argsort(name_codes, kind='stable')
+    counts = np.bincount(name_codes, minlength=len(names))
+    offsets = pd.DataFrame(
+        {
+            'start': np.cumsum(counts) - counts,
+            'count': counts
+        },
+        index=names
+    )
+    return offsets, x_coords[sort_order], y_coords[sort_order]
+
+
+def gather_vertex_slices(starts, counts):
+    """
+    returns the positions of all vertices for a sequence of slices
+    :param np.ndarray starts
+    :param np.ndarray counts
+    :return: np.ndarray
+    """
+    slice_offsets = np.cumsum(counts) - counts
+    return np.repeat(starts - slice_offsets, counts) + np.arange(counts.sum())
 
 
-def add_z_to_points(sr):
+# z coordinates
+def elevations_to_float(elev_values):
     """
-    adds the elevation to a point geometry
-    :param PandasSeries sr: one line of the DataFrame already with geometry
-    :return: QgsGeometry
+    converts elevations or offsets to floats; missing values and '*' become np.nan
+    :param pd.Series elev_values
+    :return: np.ndarray
     """
-    f_geometry = sr['geometry']
-    z_coord = sr['Elevation']
-    f_geometry_string_z = f_geometry.asWkt()[:-1]+' '+str(z_coord)+')'
-    f_geometry_z = QgsGeometry.fromWkt(f_geometry_string_z)
-    return f_geometry_z
+    return pd.to_numeric(
+        elev_values.where(elev_values != '*'),
+        errors='coerce'
+    ).to_numpy(dtype=np.float64)
+
+
+def get_node_elevations(dict_all_vals):
+    """
+    creates an index of the elevations of all nodes;
+    works on raw data lists and on already processed sections
+    :param dict dict_all_vals
+    :return: pd.Series: elevation by node name
+    """
+    node_names = []
+    node_elevs = []
+    for section_i in ['JUNCTIONS', 'OUTFALLS', 'DIVIDERS', 'STORAGE']:
+        if section_i in dict_all_vals.keys():
+            section_data = dict_all_vals[section_i]['data']
+            if isinstance(section_data, pd.DataFrame):
+                node_names.append(section_data['Name'])
+                node_elevs.append(section_data['Elevation'])
+            else:
+                node_names.append(pd.Series([x[0] for x in section_data], dtype=object))
+                node_elevs.append(pd.Series([x[1] for x in section_data], dtype=object))
+    if len(node_names) == 0:
+        return pd.Series(dtype=np.float64)
+    node_elevations = pd.Series(
+        elevations_to_float(pd.concat(node_elevs, ignore_index=True)),
+        index=pd.concat(node_names, ignore_index=True)
+    )
+    # the first section containing the node is used
+    return node_elevations[~node_elevations.index.duplicated()]
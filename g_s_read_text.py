@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ GenerateSwmmInp
+                                 A QGIS plugin
+ This plugin generates SWMM Input files
+ Generated by Plugin Builder: http://g-sherman.github.io/Qgis-Plugin-Builder/
+                              -------------------
+        begin                : 2021-07-09
+        copyright            : (C) 2021 by Jannik Schilling
+        email                : jannik.schilling@posteo.de
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+__author__ = 'Jannik Schilling'
+__date__ = '2024-04-10'
+__copyright__ = '(C) 2021 by Jannik Schilling'
+
+import codecs
+import mmap
+import os
+import re
+
+# encodings to try for SWMM text files (in this order)
+def_text_encodings = ['utf-8', 'windows-1250', 'windows-1252']  # add more
+# lines with a section header, e.g. "[JUNCTIONS]"
+section_header_pattern = re.compile(rb'^[ \t]*\[([^\]\r\n]*)\][ \t]*\r?$', re.MULTILINE)
+# first value of lines with data (no comments, no section headers)
+data_line_pattern = re.compile(rb'^[ \t]*([^;\[\s]\S*)', re.MULTILINE)
+
+
+def get_text_encoding(
+    mapped_text,
+    encodings=def_text_encodings,
+    chunk_size=1048576,
+    byte_ranges=None
+):
+    """
+    finds the first encoding which can decode the whole text;
+    the text is validated chunkwise without keeping the decoded text
+    :param mmap.mmap mapped_text
+    :param list encodings
+    :param int chunk_size: bytes per validation step
+    :param list byte_ranges: (start, end) tuples to validate; default: the whole text
+    :return: str or None
+    """
+    if byte_ranges is None:
+        byte_ranges = [(0, len(mapped_text))]
+    for e in encodings:
+        try:
+            for range_start, range_end in byte_ranges:
+                decoder = codecs.getincrementaldecoder(e)()
+                for chunk_start in range(range_start, range_end, chunk_size):
+                    chunk_end = min(chunk_start+chunk_size, range_end)
+                    decoder.decode(mapped_text[chunk_start:chunk_end])
+                decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            continue
+        return e
+    return None
+
+
+def get_text_sections_index(mapped_text):
+    """
+    finds the byte positions of all sections (e.g. '[JUNCTIONS]') in a text
+    without decoding it; the section headers are plain ascii in all encodings
+    :param mmap.mmap mapped_text
+    :return: list of tuples (section name, start, end)
+    """
+    header_starts = [
+        (m.group(1).decode('ascii', 'replace').strip().upper(), m.start())
+        for m in section_header_pattern.finditer(mapped_text)
+    ]
+    header_ends = [h[1] for h in header_starts[1:]] + [len(mapped_text)]
+    return [(h[0], h[1], e) for h, e in zip(header_starts, header_ends)]
+
+
+def read_text_lines(readfile, feedback=None, section_filter=None):
+    """
+    memory-maps a text file once, detects the encoding and
+    yields the decoded lines (including line breaks)
+    :param str readfile: path of the text file
+    :param QgsProcessingFeedback feedback
+    :param function section_filter: returns True for section names to read;
+        the bytes of other sections are neither decoded nor yielded
+    """
+    if os.path.getsize(readfile) == 0:
+        return
+    with open(readfile, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped_text:
+            if section_filter is None:
+                byte_ranges = [(0, len(mapped_text))]
+            else:
+                byte_ranges = [
+                    (start, end) for section_name, start, end in get_text_sections_index(mapped_text)
+                    if section_filter(section_name)
+                ]
+            encoding = get_text_encoding(mapped_text, byte_ranges=byte_ranges)
+            if encoding is None:
+                encoding = def_text_encodings[-1]
+                decode_errors = 'replace'
+                if feedback is not None:
+                    feedback.pushWarning(
+                        'Could not detect the encoding of the file. '
+                        + 'Unknown characters are replaced'
+                    )
+            else:
+                decode_errors = 'strict'
+            if feedback is not None:
+                feedback.setProgressText('opening the file with encoding:  %s ' % encoding)
+            for range_start, range_end in byte_ranges:
+                mapped_text.seek(range_start)
+                while mapped_text.tell() < range_end:
+                    yield mapped_text.readline().decode(encoding, decode_errors)
+
+
+def read_sections_first_values(readfile):
+    """
+    reads the first value of every data line by section in a single pass
+    over the bytes of a text file (without decoding); sections which occur
+    more than once are combined
+    :param str readfile: path of the text file
+    :return: dict: {section name: (list of bytes, int number of bytes)}
+    """
+    sections_values = {}
+    if os.path.getsize(readfile) == 0:
+        return sections_values
+    with open(readfile, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped_text:
+            for section_name, start, end in get_text_sections_index(mapped_text):
+                first_values = data_line_pattern.findall(mapped_text, start, end)
+                if section_name in sections_values.keys():
+                    section_values, section_bytes = sections_values[section_name]
+                    sections_values[section_name] = (section_values + first_values, section_bytes + end - start)
+                else:
+                    sections_values[section_name] = (first_values, end - start)
+    return sections_values
@@ -30,26 +30,44 @@ import pandas as pd
 import os
 import numpy as np
 import copy
+import sqlite3
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ThreadPoolExecutor,
+    wait
+)
+from contextlib import closing
+from itertools import islice
+from pathlib import Path
+from osgeo import gdal, ogr, osr
 from qgis import processing
 from qgis.core import (
     NULL,
     QgsCoordinateReferenceSystem,
-    QgsCoordinateTransform,
     QgsFeature,
+    QgsFeatureRequest,
     QgsField,
-    QgsGeometry,
+    QgsFields,
     QgsProcessingException,
     QgsProcessingFeedback,
     QgsProject,
+    QgsProviderRegistry,
     QgsVectorFileWriter,
-    QgsVectorLayer
+    QgsVectorLayer,
+    QgsVectorLayerFeatureSource,
+    QgsWkbTypes
 )
 from qgis.PyQt.QtCore import (
+    QDate,
+    QDateTime,
+    QTime,
     QVariant,
     QMetaType
 )
 
 from .g_s_defaults import (
+    def_all_in_one_gpkg_prefix_key,
+    def_layer_names_dict,
     def_ogr_driver_names,
     def_ogr_driver_dict,
     def_sections_geoms_dict,
@@ -59,16 +77,35 @@ from .g_s_defaults import (
     def_line_geom,
     def_ploygon_geom
 )
-from .g_s_import_helpers import replace_nan_null
+from .g_s_import_helpers import (
+    replace_nan_null_df,
+    SectionFeedback
+)
+try:
+    from openpyxl import Workbook
+    openpyxl_available = True
+except ImportError:  # optional: tables are exported with processing instead
+    openpyxl_available = False
 
 # export functions
 # helper function for export
-def replace_null_nan(attr_value):
-    """replaces NULL with np.nan"""
-    if attr_value == NULL:
-        return np.nan
-    else:
-        return attr_value
+def replace_null_nan_df(df):
+    """
+    replaces NULL with np.nan column by column;
+    only columns of dtype object can contain NULL
+    :param pd.DataFrame df
+    :return: pd.DataFrame
+    """
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == object:
+            col_vals = df[col].to_numpy()
+            null_mask = col_vals == NULL
+            if null_mask.any():
+                col_vals = col_vals.copy()
+                col_vals[null_mask] = np.nan
+                df[col] = col_vals
+    return df
 
 def del_none_bool(df):
     """
@@ -79,29 +116,17 @@ def del_none_bool(df):
     :return: pd.DataFrame
     """
     df[df.columns[:-1]] = df[df.columns[:-1]].fillna(value=np.nan)
-    try:
-        df = df.map(replace_null_nan)
-    except BaseException:
-        # for pandas prior to 2.1.0:
-        df = df.applymap(replace_null_nan)
+    df = replace_null_nan_df(df)
     df[df.columns[:-1]] = df[df.columns[:-1]].replace('True', 'YES').replace('False', 'NO')
     return df
 
-def load_layer_to_df(
-    vlayer,
-    select_cols=[],
-    with_id=False,
-    feedback = QgsProcessingFeedback
-):
+def get_layer_columns(vlayer, select_cols=[]):
     """
-    reads layer attributes and geometries
+    returns the columns to read from a layer
     :param QgsVectorLayer vlayer
     :param list select_cols: if not empty, these will be extracted
-    :param bool with_id
-    :param QgsProcessingFeedback feedback
-    :return: pd.DataFrame
+    :return: list
     """
-    feedback.setProgressText('    layer: '+vlayer.name())
     cols = [f.name() for f in vlayer.fields()]
     if len(select_cols) > 0:
         if all([x in cols for x in select_cols]):
@@ -113,30 +138,45 @@ def load_layer_to_df(
                 + vlayer.name()
                 + ': ' + ', '.join(missing_cols)
             )
+    if 'Name' not in [f.name() for f in vlayer.fields()]:
+        raise QgsProcessingException(
+            'Missing colums in layer '
+            + vlayer.name()
+            + ': Name'
+        )
+    return cols
+
 
-    # check for missing and duplicat names and null or missing geometries
-    check_list = [[f['Name'], f.id(), f.hasGeometry()] for f in vlayer.getFeatures()]
+def check_layer_features(layer_name, feature_names, feature_ids, has_geoms=None):
+    """
+    checks for missing and duplicat names and null or missing geometries
+    :param str layer_name
+    :param list feature_names
+    :param list feature_ids
+    :param list has_geoms: bool for every feature; None if geometries are not checked
+    """
+    if has_geoms is None:
+        has_geoms = [True] * len(feature_names)
     seen = set()
     duplicat_names_list = []
     missing_names_list = []
     missing_geoms_list = []
-    for f in check_list:
-        feature_name = f[0]
+    for feature_name, feature_id, has_geom in zip(feature_names, feature_ids, has_geoms):
         if not feature_name:
-            missing_names_list.append(str(f[1]))  # add id to list
-            feature_name = 'id = ' + str(f[1])  # replace with id for geometry check
+            missing_names_list.append(str(feature_id))  # add id to list
+            feature_name = 'id = ' + str(feature_id)  # replace with id for geometry check
         else:
             feature_name = str(feature_name)  # just in case it is numeric
             if feature_name in seen:
                 duplicat_names_list.append(feature_name)
             else:
                 seen.add(feature_name)
-        if not f[2]:  # no geometry
+        if not has_geom:  # no geometry
             missing_geoms_list.append(feature_name)
     duplicat_names_list = list(set(duplicat_names_list))
     if missing_names_list or duplicat_names_list or missing_geoms_list:
         exception_text = (
-            'Error in layer '+ vlayer.name()+':\n'
+            'Error in layer '+ layer_name+':\n'
             +(
                 (
                     '  missing attribute \"Name\" (primary key in SWMM) for feature(s) with id = '
@@ -159,204 +199,577 @@ def load_layer_to_df(
         raise QgsProcessingException(exception_text)
 
 
-    # data generator
-    if with_id is True:
-        datagen = ([f[col] for col in cols] + [f.geometry()] + [f.id()] for f in vlayer.getFeatures())
-        df = pd.DataFrame.from_records(data=datagen, columns=cols+['geometry', 'id'])
-    else:
-        datagen = ([f[col] for col in cols]+[f.geometry()] for f in vlayer.getFeatures())
-        df = pd.DataFrame.from_records(data=datagen, columns=cols+['geometry'])
+def load_layer_to_df(
+    vlayer,
+    select_cols=[],
+    with_id=False,
+    feedback = QgsProcessingFeedback,
+    with_geometry=True,
+    feature_source=None
+):
+    """
+    reads layer attributes and geometries in a single pass and checks
+    for missing or duplicat names and missing geometries;
+    only the selected attributes are requested from the data provider
+    :param QgsVectorLayer vlayer
+    :param list select_cols: if not empty, these will be extracted
+    :param bool with_id
+    :param QgsProcessingFeedback feedback
+    :param bool with_geometry: if False, geometries are neither read nor checked
+    :param QgsVectorLayerFeatureSource feature_source: features are read from
+        this source instead of the layer (e.g. in worker threads)
+    :return: pd.DataFrame
+    """
+    feedback.setProgressText('    layer: '+vlayer.name())
+    cols = get_layer_columns(vlayer, select_cols)
+    layer_fields = vlayer.fields()
+    name_idx = layer_fields.indexOf('Name')
+    cols_idx = [layer_fields.indexOf(col) for col in cols]
+    request = QgsFeatureRequest()
+    request.setSubsetOfAttributes(list(set(cols_idx + [name_idx])))
+    if not with_geometry:
+        request.setFlags(QgsFeatureRequest.NoGeometry)
+    records = []
+    feature_names = []
+    feature_ids = []
+    has_geoms = [] if with_geometry else None
+    if feature_source is None:
+        feature_source = vlayer
+    for f in feature_source.getFeatures(request):
+        f_attrs = f.attributes()
+        record = [f_attrs[i] for i in cols_idx]
+        feature_names.append(f_attrs[name_idx])
+        feature_ids.append(f.id())
+        if with_geometry:
+            has_geoms.append(f.hasGeometry())
+            record.append(f.geometry())
+        if with_id:
+            record.append(f.id())
+        records.append(record)
+    check_layer_features(vlayer.name(), feature_names, feature_ids, has_geoms)
+    df_cols = cols + (['geometry'] if with_geometry else []) + (['id'] if with_id else [])
+    df = pd.DataFrame.from_records(data=records, columns=df_cols)
     return df
 
 
-def read_data_direct(
-    export_data,
+# GeoPackage layers
+# field types which are read directly from GeoPackages
+gpkg_direct_field_types = [
+    QVariant.Int,
+    QVariant.LongLong,
+    QVariant.Double,
+    QVariant.String,
+    QVariant.Bool
+]
+# size of the envelope in the header of GeoPackage geometries by envelope indicator
+gpkg_envelope_sizes = {0: 0, 1: 32, 2: 48, 3: 48, 4: 64}
+
+
+def get_gpkg_layer_source(vlayer):
+    """
+    returns the GeoPackage file and table of a layer which can be read directly
+    (no filter, no edits, no virtual or joined fields, no date fields)
+    :param QgsVectorLayer vlayer
+    :return: tuple (str, str) or None
+    """
+    if vlayer.providerType() != 'ogr' or vlayer.dataProvider().storageType() != 'GPKG':
+        return None
+    if vlayer.subsetString() != '' or vlayer.isEditable():
+        return None
+    layer_fields = vlayer.fields()
+    for i, field in enumerate(layer_fields):
+        if layer_fields.fieldOrigin(i) != QgsFields.OriginProvider:
+            return None
+        if field.type() not in gpkg_direct_field_types:
+            return None
+    uri_parts = QgsProviderRegistry.instance().decodeUri('ogr', vlayer.source())
+    if uri_parts.get('layerName') is None:
+        return None
+    return uri_parts['path'], uri_parts['layerName']
+
+
+def gpkg_geometry_to_wkb(gpkg_geom):
+    """
+    removes the header of a GeoPackage geometry
+    :param bytes gpkg_geom
+    :return: bytes or None for NULL and empty geometries
+    """
+    if gpkg_geom is None:
+        return None
+    if len(gpkg_geom) < 8 or gpkg_geom[:2] != b'GP':
+        raise ValueError('not a GeoPackage geometry')
+    flags = gpkg_geom[3]
+    if flags & 16:  # empty geometry
+        return None
+    envelope_size = gpkg_envelope_sizes.get((flags >> 1) & 7)
+    if envelope_size is None:
+        raise ValueError('invalid envelope indicator in a GeoPackage geometry')
+    return bytes(gpkg_geom[8 + envelope_size:])
+
+
+def sql_name(name):
+    """quotes a table or column name for SQLite"""
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def load_gpkg_layer_to_df(
+    vlayer,
+    gpkg_source,
     select_cols=[],
     with_id=False,
     feedback = QgsProcessingFeedback
 ):
     """
-    reads layers from swmm model (main read function)
-    :param dict export_data
+    reads attributes and geometries of a GeoPackage layer with one query;
+    the geometries are kept as wkb; same checks as in load_layer_to_df
+    :param QgsVectorLayer vlayer
+    :param tuple gpkg_source: GeoPackage file and table name
+    :param list select_cols: if not empty, these will be extracted
+    :param bool with_id
+    :param QgsProcessingFeedback feedback
+    :return: pd.DataFrame or None if the table cannot be read directly
+    """
+    feedback.setProgressText('    layer: '+vlayer.name())
+    cols = get_layer_columns(vlayer, select_cols)
+    gpkg_file, table_name = gpkg_source
+    with closing(sqlite3.connect(Path(gpkg_file).resolve().as_uri()+'?mode=ro', uri=True)) as gpkg_connection:
+        geom_col = gpkg_connection.execute(
+            'SELECT column_name FROM gpkg_geometry_columns WHERE table_name = ?',
+            (table_name,)
+        ).fetchone()
+        fid_cols = [
+            c[1] for c in gpkg_connection.execute('PRAGMA table_info('+sql_name(table_name)+')') if c[5] == 1
+        ]
+        if geom_col is None or len(fid_cols) != 1:
+            return None
+        geom_col = geom_col[0]
+        fid_col = fid_cols[0]
+        query_cols = cols + ['Name', geom_col, fid_col]
+        records = gpkg_connection.execute(
+            'SELECT ' + ', '.join(sql_name(c) for c in query_cols)
+            + ' FROM ' + sql_name(table_name)
+            + ' ORDER BY ' + sql_name(fid_col)
+        ).fetchall()
+    df = pd.DataFrame.from_records(
+        data=records,
+        columns=cols + ['Name_check', 'geometry', 'id']
+    )
+    df['geometry'] = [gpkg_geometry_to_wkb(g) for g in df['geometry']]
+    check_layer_features(
+        vlayer.name(),
+        df['Name_check'].tolist(),
+        df['id'].tolist(),
+        df['geometry'].notna().tolist()
+    )
+    layer_fields = vlayer.fields()
+    for col in cols:
+        if layer_fields.field(col).type() == QVariant.Bool:
+            df[col] = df[col].map({1: True, 0: False})
+    df_cols = cols + ['geometry'] + (['id'] if with_id else [])
+    return df[df_cols]
+
+
+def read_data_item(
+    data_name,
+    data_item,
+    select_cols=[],
+    with_id=False,
+    feedback=QgsProcessingFeedback,
+    feature_source=None,
+    gpkg_source=None
+):
+    """
+    reads a layer or the tables of a file in export_data;
+    layers are read from a feature source or directly from a GeoPackage
+    in order to read in worker threads
+    :param str data_name: name of SWMM section
+    :param dict data_item: entry in export_data
     :param list select_cols
     :param bool with_id
     :param QgsProcessingFeedback feedback
+    :param QgsVectorLayerFeatureSource feature_source
+    :param tuple gpkg_source: GeoPackage file and table name
+    :return: pd.DataFrame (layers) or dict of pd.DataFrames (tables)
     """
-    for k in list(export_data.keys()):
-        if export_data[k]['d_type'] == 'layer':  # layers with geometry
+    if data_item['d_type'] == 'layer':  # layers with geometry
+        data_df = None
+        if gpkg_source is not None:
+            try:
+                data_df = load_gpkg_layer_to_df(
+                    data_item['file'],
+                    gpkg_source,
+                    select_cols,
+                    with_id,
+                    feedback
+                )
+            except (sqlite3.Error, ValueError):
+                data_df = None  # read with QGIS
+        if data_df is None:
             data_df = load_layer_to_df(
-                export_data[k]['file'],
+                data_item['file'],
                 select_cols,
                 with_id,
-                feedback
+                feedback,
+                feature_source=feature_source
             )
-            if len(data_df) > 0:
-                data_df = del_none_bool(data_df)
-                export_data[k]['data'] = data_df
-            else:
-                del export_data[k]
-        else:  # table
-            table_file = export_data[k]['file']
-            sheets_list = list(def_tables_dict[k]['tables'].keys())
-            export_data[k]['data'] = {}
-            for sheet_name in sheets_list:
-                export_data[k]['data'][sheet_name] = read_data_from_table_direct(
-                    table_file,
-                    sheet=sheet_name,
-                    feedback=feedback
-                )
-            
+        if len(data_df) > 0:
+            data_df = del_none_bool(data_df)
+        return data_df
+    sheets_list = list(def_tables_dict[data_name]['tables'].keys())
+    if 'gpkg_tables' in data_item.keys():  # tables in an all-in-one GeoPackage
+        return read_tables_from_file(
+            data_item['file'],
+            sheets_list,
+            feedback,
+            layer_names=data_item['gpkg_tables']
+        )
+    return read_tables_from_file(data_item['file'], sheets_list, feedback)
+
 
+def read_data_direct(
+    export_data,
+    select_cols=[],
+    with_id=False,
+    feedback = QgsProcessingFeedback,
+    max_workers=4
+):
+    """
+    reads layers from swmm model (main read function);
+    the layers and table files are read concurrently, every worker
+    reads from its own feature source or file connection
+    :param dict export_data
+    :param list select_cols
+    :param bool with_id
+    :param QgsProcessingFeedback feedback
+    :param int max_workers: number of files read at the same time
+    """
+    if len(export_data) == 0:
+        return
+    # feature sources are created in the main thread
+    read_sources = {}
+    for k, data_item in export_data.items():
+        if data_item['d_type'] == 'layer':
+            read_sources[k] = {
+                'feature_source': QgsVectorLayerFeatureSource(data_item['file']),
+                'gpkg_source': get_gpkg_layer_source(data_item['file'])
+            }
+        else:
+            read_sources[k] = {}
+    item_feedbacks = {k: SectionFeedback(feedback) for k in export_data.keys()}
+    with ThreadPoolExecutor(max_workers=min(len(export_data), max_workers)) as executor:
+        futures_pending = {
+            executor.submit(
+                read_data_item,
+                k,
+                data_item,
+                select_cols,
+                with_id,
+                item_feedbacks[k],
+                **read_sources[k]
+            ): k for k, data_item in export_data.items()
+        }
+        futures_names = dict(futures_pending)
+        futures_pending = set(futures_pending.keys())
+        n_done = 0
+        while len(futures_pending) > 0:
+            futures_done, futures_pending = wait(
+                futures_pending,
+                timeout=0.2,
+                return_when=FIRST_COMPLETED
+            )
+            for item_fb in item_feedbacks.values():
+                item_fb.flush()
+            for future_i in futures_done:
+                k = futures_names[future_i]
+                data = future_i.result()  # raises errors of the workers
+                if export_data[k]['d_type'] == 'layer' and len(data) == 0:
+                    del export_data[k]
+                else:
+                    export_data[k]['data'] = data
+                n_done = n_done + 1
+            feedback.setProgress(n_done / len(futures_names) * 100)
 
 
 # tables
-def read_data_from_table_direct(tab_file, sheet=0, feedback=QgsProcessingFeedback):
-    """
-    reads curves or other tables from excel or gpkg
-    :param str file
-    :param str/int sheet
-    """
-    feedback.setProgressText('    table: '+sheet)
-    table_layers = QgsVectorLayer(tab_file, 'NoGeometry', 'ogr')
-    table_provider = table_layers.dataProvider()
-    sublayers = table_provider.subLayers()
-    name_separator = table_provider.sublayerSeparator()
-    sheets = [x.split(name_separator)[1] for x in sublayers]
-    if sheet == 0:
-        s_n = sheets[0]
-    else:
-        if sheet in sheets:
-            s_n = sheet
-        elif str(sheet).upper() in sheets:
-            s_n = str(sheet).upper()
-        elif str(sheet).lower() in sheets:
-            s_n = str(sheet).lower()
-        elif str(sheet).capitalize() in sheets:
-            s_n = str(sheet).capitalize()
-        else:
-            s_n = None
-    if s_n is not None:
-        tab_layer_to_load = tab_file+'|layername='+str(s_n)
-        vlayer = QgsVectorLayer(tab_layer_to_load, 'NoGeometry', 'ogr')
-        cols = [f.name() for f in vlayer.fields()]
-        datagen = ([f[col] for col in cols] for f in vlayer.getFeatures())
-        data_df = pd.DataFrame.from_records(data=datagen, columns=cols)
-        try:
-            data_df = data_df.map(replace_null_nan)
-        except BaseException:
-            # for pandas prior to 2.1.0:
-            data_df = data_df.applymap(replace_null_nan)
-        if all([x.startswith('Field') for x in data_df.columns]):
-            rename_cols = {i:j for i, j in zip(cols, data_df.loc[0,:].tolist())}
-            data_df = data_df.drop(index=0)
-            data_df.rename(columns=rename_cols, inplace=True)
-        data_df.dropna(axis=0, how='all', inplace=True)  # delete empty rows
-        data_df.reset_index(drop=True, inplace=True)
-        if 'fid' in cols:
-            data_df = data_df.drop(columns=['fid'])
-    else:
-        data_df = pd.DataFrame()
+# open options of the spreadsheet drivers: the first row contains the column names
+def_table_open_options = {
+    '.xlsx': ['HEADERS=FORCE'],
+    '.ods': ['HEADERS=FORCE']
+}
+
+
+def ogr_date_value(ogr_feature, field_index):
+    """returns the value of a date field as QDate"""
+    dt = ogr_feature.GetFieldAsDateTime(field_index)
+    return QDate(dt[0], dt[1], dt[2])
+
+
+def ogr_time_value(ogr_feature, field_index):
+    """returns the value of a time field as QTime"""
+    dt = ogr_feature.GetFieldAsDateTime(field_index)
+    return QTime(dt[3], dt[4], int(dt[5]))
+
+
+def ogr_datetime_value(ogr_feature, field_index):
+    """returns the value of a datetime field as QDateTime"""
+    return QDateTime(
+        ogr_date_value(ogr_feature, field_index),
+        ogr_time_value(ogr_feature, field_index)
+    )
+
+
+def ogr_bool_value(ogr_feature, field_index):
+    """returns the value of a boolean field as bool"""
+    return bool(ogr_feature.GetField(field_index))
+
+
+def ogr_field_value(ogr_feature, field_index):
+    """returns the value of a field"""
+    return ogr_feature.GetField(field_index)
+
+
+def get_ogr_value_function(field_defn):
+    """
+    selects the function which reads the values of a field
+    with the same types as QGIS (e.g. QDate, QTime)
+    :param ogr.FieldDefn field_defn
+    :return: function
+    """
+    field_type = field_defn.GetType()
+    if field_type == ogr.OFTDate:
+        return ogr_date_value
+    if field_type == ogr.OFTTime:
+        return ogr_time_value
+    if field_type == ogr.OFTDateTime:
+        return ogr_datetime_value
+    if field_type == ogr.OFTInteger and field_defn.GetSubType() == ogr.OFSTBoolean:
+        return ogr_bool_value
+    return ogr_field_value
+
+
+def read_ogr_table(ogr_layer, header_row_check=True):
+    """
+    reads a single table (sheet or GeoPackage table) into a DataFrame
+    :param ogr.Layer ogr_layer
+    :param bool header_row_check: if True, the first row is used as header
+        if the driver did not detect the column names
+    :return: pd.DataFrame
+    """
+    layer_defn = ogr_layer.GetLayerDefn()
+    field_defns = [layer_defn.GetFieldDefn(i) for i in range(layer_defn.GetFieldCount())]
+    cols = [field_defn.GetName() for field_defn in field_defns]
+    value_functions = list(enumerate(get_ogr_value_function(field_defn) for field_defn in field_defns))
+    ogr_layer.ResetReading()
+    datagen = (
+        [
+            value_function(ogr_feature, i) if ogr_feature.IsFieldSetAndNotNull(i) else np.nan
+            for i, value_function in value_functions
+        ] for ogr_feature in ogr_layer
+    )
+    data_df = pd.DataFrame.from_records(data=datagen, columns=cols)
+    if (
+        header_row_check
+        and len(data_df) > 0
+        and all([x.startswith('Field') for x in data_df.columns])
+    ):
+        rename_cols = {i:j for i, j in zip(cols, data_df.loc[0,:].tolist())}
+        data_df = data_df.drop(index=0)
+        data_df.rename(columns=rename_cols, inplace=True)
+    data_df.dropna(axis=0, how='all', inplace=True)  # delete empty rows
+    data_df.reset_index(drop=True, inplace=True)
     return data_df
 
+
+def read_tables_from_file(
+    tab_file,
+    sheets_list,
+    feedback=QgsProcessingFeedback,
+    layer_names=None
+):
+    """
+    reads the sheets of a workbook (or the tables of a GeoPackage)
+    with the file opened once; sheet names are resolved case-insensitively
+    :param str tab_file
+    :param list sheets_list: names of the sheets to read
+    :param QgsProcessingFeedback feedback
+    :param dict layer_names: name in the file for every sheet name (default: sheet name)
+    :return: dict of pd.DataFrames; empty DataFrames for missing sheets
+    """
+    open_options = def_table_open_options.get(os.path.splitext(tab_file)[1].lower(), [])
+    tab_dataset = gdal.OpenEx(
+        tab_file,
+        gdal.OF_VECTOR | gdal.OF_READONLY,
+        open_options=open_options
+    )
+    if tab_dataset is None:
+        raise QgsProcessingException('Could not open the table file ' + str(tab_file))
+    file_layer_names = [tab_dataset.GetLayer(i).GetName() for i in range(tab_dataset.GetLayerCount())]
+    file_layer_names_upper = {}
+    for file_layer_name in file_layer_names:
+        file_layer_names_upper.setdefault(file_layer_name.upper(), file_layer_name)
+    tables_data = {}
+    for sheet_name in sheets_list:
+        feedback.setProgressText('    table: '+sheet_name)
+        if layer_names is None:
+            layer_name = sheet_name
+        else:
+            layer_name = layer_names.get(sheet_name)
+        if layer_name is not None and layer_name not in file_layer_names:
+            layer_name = file_layer_names_upper.get(str(layer_name).upper())
+        if layer_name is None:
+            tables_data[sheet_name] = pd.DataFrame()
+        else:
+            tables_data[sheet_name] = read_ogr_table(
+                tab_dataset.GetLayerByName(layer_name),
+                header_row_check=len(open_options) == 0
+            )
+    tab_dataset = None  # closes the file
+    return tables_data
+
+
+def get_gpkg_table_name(section_name, sheet_name, result_prefix=''):
+    """
+    returns the name of a table in an all-in-one GeoPackage
+    :param str section_name: name of SWMM section
+    :param str sheet_name
+    :param str result_prefix
+    :return: str
+    """
+    table_name = def_tables_dict[section_name]['filename']+'_'+str(sheet_name)
+    if result_prefix != '':
+        table_name = str(result_prefix)+'_'+table_name
+    return table_name
+
+
+def add_gpkg_to_export_data(gpkg_file, export_data, feedback):
+    """
+    adds the layers and tables of an all-in-one GeoPackage to export_data;
+    the GeoPackage is opened only once to list its layers, sections
+    which are already in export_data are kept
+    :param str gpkg_file
+    :param dict export_data
+    :param QgsProcessingFeedback feedback
+    """
+    feedback.setProgressText('Reading layer names from '+gpkg_file)
+    gpkg_ds = ogr.Open(gpkg_file, 0)
+    if gpkg_ds is None:
+        raise QgsProcessingException('Could not open file '+gpkg_file)
+    gpkg_layer_names = [
+        gpkg_ds.GetLayerByIndex(i).GetName() for i in range(gpkg_ds.GetLayerCount())
+    ]
+    # the result prefix is stored by write_all_in_one_gpkg
+    result_prefix = gpkg_ds.GetMetadataItem(def_all_in_one_gpkg_prefix_key)
+    if result_prefix is None:
+        result_prefix = ''
+    gpkg_ds = None  # closes the file
+
+    def find_gpkg_layer(layer_name):
+        """returns the GeoPackage layer with the exact name (with the result prefix)"""
+        if result_prefix != '':
+            layer_name = result_prefix+'_'+layer_name
+        if layer_name in gpkg_layer_names:
+            return layer_name
+        else:
+            return None
+
+    for section_name, layer_name in def_layer_names_dict.items():
+        if section_name in export_data.keys():
+            continue
+        gpkg_layer_name = find_gpkg_layer(layer_name)
+        if gpkg_layer_name is not None:
+            export_data[section_name] = {
+                'file': QgsVectorLayer(
+                    gpkg_file+'|layername='+gpkg_layer_name,
+                    gpkg_layer_name,
+                    'ogr'
+                )
+            }
+    for section_name in def_tables_dict.keys():
+        if section_name in export_data.keys():
+            continue
+        gpkg_tables = {}
+        for sheet_name in def_tables_dict[section_name]['tables'].keys():
+            gpkg_layer_name = find_gpkg_layer(get_gpkg_table_name(section_name, sheet_name))
+            if gpkg_layer_name is not None:
+                gpkg_tables[sheet_name] = gpkg_layer_name
+        if len(gpkg_tables) > 0:
+            export_data[section_name] = {
+                'file': gpkg_file,
+                'gpkg_tables': gpkg_tables
+            }
+
 # import
 # write functions and helpers
 
-def create_feature_from_attrlist(attrlist, geom_type, f_geometry=NULL):
+def create_features_from_df(data_df, layer_fields, geom_type):
     """
-    creates a QgsFeature from data in df
-    :param list attrlist
+    creates QgsFeatures from the columns of a DataFrame
+    :param pd.DataFrame data_df: columns in the order of the fields (and 'geometry')
+    :param QgsFields layer_fields
     :param str geom_type
-    :param QgsGeometry f_geometry
+    :return: generator of QgsFeature
     """
-    f = QgsFeature()
-    if geom_type != 'NoGeometry':
+    attr_cols = [c for c in data_df.columns if c != 'geometry']
+    attr_rows = zip(*[data_df[c].tolist() for c in attr_cols])
+    if geom_type == 'NoGeometry':
+        for attrlist in attr_rows:
+            f = QgsFeature(layer_fields)
+            f.setAttributes(list(attrlist))
+            yield f
+    else:
         # handle missing geometry: replace with default
-        if f_geometry is NULL:
-            if geom_type.startswith('Polygon'):
-                f.setGeometry(def_ploygon_geom)
-            if geom_type.startswith('LineString'):
-                f.setGeometry(def_line_geom)
-            if geom_type.startswith('Point'):
-                f.setGeometry(def_point_geom)
-        else:
-            f.setGeometry(f_geometry)
-    f.setAttributes(attrlist)
-    return f
+        if geom_type.startswith('Polygon'):
+            default_geom = def_ploygon_geom
+        if geom_type.startswith('LineString'):
+            default_geom = def_line_geom
+        if geom_type.startswith('Point'):
+            default_geom = def_point_geom
+        for attrlist, f_geometry in zip(attr_rows, data_df['geometry'].tolist()):
+            f = QgsFeature(layer_fields)
+            f.setAttributes(list(attrlist))
+            if f_geometry is NULL:
+                f.setGeometry(default_geom)
+            else:
+                f.setGeometry(f_geometry)
+            yield f
+
 
-def create_feature_from_row(df, geom_type):
+def add_features_in_chunks(feature_sink, features, chunk_size=10000):
     """
-    creates a QgsFeature from data in df
-    :param pd.DataFrame df
-    :param str geom_type
-    :return: QgsFeature
+    adds features to a data provider or file writer in chunks
+    :param QgsFeatureSink feature_sink: e.g. QgsVectorDataProvider, QgsVectorFileWriter
+    :param iterable features
+    :param int chunk_size
     """
-    if 'geometry' in df.keys():
-        f_geometry = df['geometry']
-        attrlist = df.drop('geometry').tolist()
-        f_created = create_feature_from_attrlist(attrlist, geom_type, f_geometry)
-    else:
-        attrlist = df.tolist()
-        f_created = create_feature_from_attrlist(attrlist, geom_type)
-    return f_created
+    features = iter(features)
+    feature_chunk = list(islice(features, chunk_size))
+    while len(feature_chunk) > 0:
+        feature_sink.addFeatures(feature_chunk)
+        feature_chunk = list(islice(features, chunk_size))
 
-def transform_crs_function(
-    vector_layer,
-    current_crs_string,
-    transform_crs_string
-):
+
+def get_layer_crs_string(crs_result, transform_crs_string='NA'):
     """
-    transforms a layer CRS
-    :param QgsVectorLayer vector_layer
-    :param str current_crs_string
+    returns the CRS of the created layers; the coordinates are transformed
+    (if required) before the geometries are created
+    :param str crs_result: epsg code of the CRS of the input file
     :param str transform_crs_string
+    :return: str
     """
-    current_crs = QgsCoordinateReferenceSystem(current_crs_string)
-    transform_crs = QgsCoordinateReferenceSystem(transform_crs_string)
-    vector_layer.startEditing()
-    for ft in vector_layer.getFeatures():
-        geom = ft.geometry()
-        geom = QgsGeometry(geom)
-        geom.transform(
-            QgsCoordinateTransform(
-                current_crs,
-                transform_crs,
-                QgsProject.instance()
-            )
-        )
-        fid = ft.id()
-        vector_layer.changeGeometry(fid,geom)
-    vector_layer.commitChanges()
-    vector_layer.setCrs(transform_crs)
+    if transform_crs_string != 'NA':
+        return transform_crs_string
+    else:
+        return crs_result
 
 
-def create_layer_from_df(
-    data_dict,
-    section_name,
-    crs_result,
-    feedback,
-    context,
-    custom_fields=None,
-    create_empty=False,
-    transform_crs_string='NA',
-    add_z_bool=False,
-    **kwargs
-):
+def get_layer_geom_type(section_name, add_z_bool=False):
     """
-    creates a QgsVectorLayer from data in geodata_dict
-    :param dict data_dict
+    returns the geometry type of the layer for a section
     :param str section_name: name of SWMM section
-    :param str crs_result: epsg code of the desired CRS
-    :param QgsProcessingFeedback feedback
-    :param dict custom_fields: additional fields e.g. annotations
-    :param bool create_empty
-    :param str transform_crs_string
+    :param bool add_z_bool
+    :return: str: e.g. 'PointZ' or 'NoGeometry'
     """
-    data_df = data_dict['data']
-    layer_name = data_dict['layer_name']
-
-    # create layer with geometry type 
     if section_name in def_sections_geoms_dict.keys():
-        feedback.setProgressText('Writing layer for section \"'+section_name+'\"')
         geom_type = def_sections_geoms_dict[section_name]
         if add_z_bool:
             if section_name in [
@@ -367,11 +780,20 @@ def create_layer_from_df(
                 'CONDUITS'
             ]:
                 geom_type = geom_type+'Z'
-        geom_type = geom_type+'?crs='+crs_result
     else:
         geom_type = 'NoGeometry'  # for simple tables
-    vector_layer = QgsVectorLayer(geom_type, layer_name, 'memory')
+    return geom_type
 
+
+def get_layer_fields(section_name, layer_name, geom_type, custom_fields=None):
+    """
+    creates the QgsFields of a layer for a section
+    :param str section_name: name of SWMM section
+    :param str layer_name: table name for sections without geometry
+    :param str geom_type
+    :param dict custom_fields: additional fields e.g. annotations
+    :return: tuple (dict, QgsFields): field types by name, fields
+    """
     # set fields
     # before QGIS Version 3.38
     field_types_dict_old = {
@@ -395,21 +817,39 @@ def create_layer_from_df(
     if geom_type != 'NoGeometry':
         layer_fields = copy.deepcopy(def_qgis_fields_dict[section_name])
     else:
-        layer_fields = def_tables_dict[section_name]['tables'][layer_name]
+        layer_fields = copy.deepcopy(def_tables_dict[section_name]['tables'][layer_name])
     if custom_fields is not None:
         layer_fields.update(custom_fields)
-    vector_layer.startEditing()
+    qgs_fields = QgsFields()
     for col, field_type_string in layer_fields.items():
         try:
             # QgsField with QVariant is deprecated since QGIS 3.38 -> QMetaType
             field_type = field_types_dict[field_type_string]
-            vector_layer.addAttribute(QgsField(col, field_type))
+            qgs_fields.append(QgsField(col, field_type))
         except:
             field_type = field_types_dict_old[field_type_string]
-            vector_layer.addAttribute(QgsField(col, field_type))
-    vector_layer.updateFields()
+            qgs_fields.append(QgsField(col, field_type))
+    return layer_fields, qgs_fields
 
-    # get data_df columns in the correct order
+
+def prepare_df_for_layer(
+    data_df,
+    section_name,
+    layer_fields,
+    geom_type,
+    feedback,
+    create_empty=False
+):
+    """
+    gets the columns of data_df in the order of the layer fields
+    :param pd.DataFrame data_df
+    :param str section_name: name of SWMM section
+    :param dict layer_fields: field types by name
+    :param str geom_type
+    :param QgsProcessingFeedback feedback
+    :param bool create_empty
+    :return: pd.DataFrame
+    """
     if not create_empty:
         data_df_column_order = list(layer_fields.keys())
         if geom_type != 'NoGeometry':
@@ -425,38 +865,304 @@ def create_layer_from_df(
                 )
         else:
             # replace nan with NULL in tables
-            try:
-                data_df = data_df.map(replace_nan_null)
-            except BaseException:
-                # for pandas prior to 2.1.0:
-                data_df = data_df.applymap(replace_nan_null)
+            data_df = replace_nan_null_df(data_df)
         data_df = data_df[data_df_column_order]
+    return data_df
+
+
+def create_layer_from_df(
+    data_dict,
+    section_name,
+    crs_result,
+    feedback,
+    context,
+    custom_fields=None,
+    create_empty=False,
+    transform_crs_string='NA',
+    add_z_bool=False,
+    **kwargs
+):
+    """
+    creates a QgsVectorLayer from data in geodata_dict
+    :param dict data_dict
+    :param str section_name: name of SWMM section
+    :param str crs_result: epsg code of the desired CRS
+    :param QgsProcessingFeedback feedback
+    :param dict custom_fields: additional fields e.g. annotations
+    :param bool create_empty
+    :param str transform_crs_string: CRS of the (already transformed) geometries
+    """
+    data_df = data_dict['data']
+    layer_name = data_dict['layer_name']
+
+    # create layer with geometry type 
+    geom_type = get_layer_geom_type(section_name, add_z_bool)
+    if geom_type != 'NoGeometry':
+        feedback.setProgressText('Writing layer for section \"'+section_name+'\"')
+        geom_type = geom_type+'?crs='+get_layer_crs_string(crs_result, transform_crs_string)
+    vector_layer = QgsVectorLayer(geom_type, layer_name, 'memory')
+    layer_fields, qgs_fields = get_layer_fields(
+        section_name,
+        layer_name,
+        geom_type,
+        custom_fields
+    )
+    vector_provider = vector_layer.dataProvider()
+    vector_provider.addAttributes(qgs_fields.toList())
+    vector_layer.updateFields()
+
+    # get data_df columns in the correct order
+    data_df = prepare_df_for_layer(
+        data_df,
+        section_name,
+        layer_fields,
+        geom_type,
+        feedback,
+        create_empty
+    )
     if len(data_df) != 0:
         # add features if data_df is not empty (which can be the case for tables)
-        feature_list = data_df.apply(lambda x: create_feature_from_row(x, geom_type), axis=1)
-        vector_layer.addFeatures(feature_list)
+        add_features_in_chunks(
+            vector_provider,
+            create_features_from_df(data_df, vector_layer.fields(), geom_type)
+        )
         vector_layer.updateExtents()
-    vector_layer.commitChanges()
+    return vector_layer
 
-    # transformation of CRS
-    if transform_crs_string != 'NA' and geom_type != 'NoGeometry':
-        reprojected = processing.run(
-            "native:reprojectlayer",
-            {
-                'INPUT': vector_layer,
-                'TARGET_CRS': QgsCoordinateReferenceSystem(transform_crs_string),
-                'CONVERT_CURVED_GEOMETRIES': False,
-                'OUTPUT': 'TEMPORARY_OUTPUT'
-            },
-            feedback = feedback,
-            context = context
+
+def write_layer_from_df(
+    data_dict,
+    section_name,
+    crs_result,
+    feedback,
+    folder_save,
+    geodata_driver_num,
+    custom_fields=None,
+    create_empty=False,
+    transform_crs_string='NA',
+    add_z_bool=False,
+    **kwargs
+):
+    """
+    writes the data of a geometry section directly into a file without
+    an intermediate memory layer; features are added in chunks
+    :param dict data_dict
+    :param str section_name: name of SWMM section
+    :param str crs_result: epsg code of the CRS of the data
+    :param QgsProcessingFeedback feedback
+    :param str folder_save
+    :param int geodata_driver_num
+    :param dict custom_fields: additional fields e.g. annotations
+    :param bool create_empty
+    :param str transform_crs_string: CRS of the (already transformed) geometries
+    :param bool add_z_bool
+    """
+    data_df = data_dict['data']
+    layer_name = data_dict['layer_name']
+    feedback.setProgressText('Writing layer for section \"'+section_name+'\"')
+    geodata_driver_name = def_ogr_driver_names[geodata_driver_num]
+    geodata_driver_extension = def_ogr_driver_dict[geodata_driver_name]
+    fname = os.path.join(
+        folder_save,
+        layer_name + '.' + geodata_driver_extension
+    )
+    if os.path.isfile(fname):
+        raise QgsProcessingException('File '+fname
+        + ' already exists. Please choose another folder.')
+    geom_type = get_layer_geom_type(section_name, add_z_bool)
+    layer_fields, qgs_fields = get_layer_fields(
+        section_name,
+        layer_name,
+        geom_type,
+        custom_fields
+    )
+    data_df = prepare_df_for_layer(
+        data_df,
+        section_name,
+        layer_fields,
+        geom_type,
+        feedback,
+        create_empty
+    )
+    file_crs = QgsCoordinateReferenceSystem(
+        get_layer_crs_string(crs_result, transform_crs_string)
+    )
+    features = create_features_from_df(data_df, qgs_fields, geom_type)
+    options = QgsVectorFileWriter.SaveVectorOptions()
+    options.fileEncoding = 'utf-8'
+    options.driverName = geodata_driver_name
+    file_writer = QgsVectorFileWriter.create(
+        fname,
+        qgs_fields,
+        QgsWkbTypes.parseType(geom_type),
+        file_crs,
+        QgsProject.instance().transformContext(),
+        options
+    )
+    if file_writer.hasError() != QgsVectorFileWriter.NoError:
+        raise QgsProcessingException(
+            'Could not create file ' + fname + ': ' + file_writer.errorMessage()
         )
-        vector_layer2 = reprojected['OUTPUT']
-        vector_layer2.updateExtents()
-        vector_layer2.setName(layer_name)
-        return vector_layer2
+    add_features_in_chunks(file_writer, features)
+    del file_writer  # closes the file
+
+
+# ogr types for the all-in-one GeoPackage
+ogr_geom_types_dict = {
+    'Point': ogr.wkbPoint,
+    'PointZ': ogr.wkbPoint25D,
+    'LineString': ogr.wkbLineString,
+    'LineStringZ': ogr.wkbLineString25D,
+    'Polygon': ogr.wkbPolygon,
+    'NoGeometry': ogr.wkbNone
+}
+ogr_field_types_dict = {
+    'Double': ogr.OFTReal,
+    'String': ogr.OFTString,
+    'Int': ogr.OFTInteger,
+    'Bool': ogr.OFTInteger,  # with subtype boolean
+    'Date': ogr.OFTDate,
+    'Time': ogr.OFTTime
+}
+
+
+def set_ogr_field(ogr_feature, field_index, attr_value):
+    """
+    sets a field of an ogr feature from a QGIS attribute value
+    :param ogr.Feature ogr_feature
+    :param int field_index
+    :param attr_value
+    """
+    if isinstance(attr_value, QDate):
+        if attr_value.isNull():
+            ogr_feature.SetFieldNull(field_index)
+        else:
+            ogr_feature.SetField(field_index, attr_value.toString('yyyy-MM-dd'))
+    elif isinstance(attr_value, QTime):
+        if attr_value.isNull():
+            ogr_feature.SetFieldNull(field_index)
+        else:
+            ogr_feature.SetField(field_index, attr_value.toString('HH:mm:ss'))
+    elif isinstance(attr_value, bool):
+        ogr_feature.SetField(field_index, int(attr_value))
+    elif isinstance(attr_value, (int, str)):
+        ogr_feature.SetField(field_index, attr_value)
+    elif isinstance(attr_value, float) and not np.isnan(attr_value):
+        ogr_feature.SetField(field_index, attr_value)
+    else:  # NULL, None, nan
+        ogr_feature.SetFieldNull(field_index)
+
+
+def write_all_in_one_gpkg(
+    gpkg_items,
+    gpkg_file,
+    crs_result,
+    feedback,
+    create_empty=False,
+    transform_crs_string='NA',
+    add_z_bool=False,
+    result_prefix='',
+    **kwargs
+):
+    """
+    writes all layers and tables into one GeoPackage; the features of all
+    layers are inserted in one transaction (GDAL builds the spatial indexes
+    on commit); the file is written under a temporary name and only renamed
+    to gpkg_file if it is complete
+    :param list gpkg_items: dicts with 'data', 'layer_name', 'section_name' and 'custom_fields'
+    :param str gpkg_file
+    :param str crs_result: epsg code of the CRS of the data
+    :param QgsProcessingFeedback feedback
+    :param bool create_empty
+    :param str transform_crs_string: CRS of the (already transformed) geometries
+    :param bool add_z_bool
+    :param str result_prefix: stored in the metadata to find the layers again
+    """
+    if os.path.isfile(gpkg_file):
+        raise QgsProcessingException('File '+gpkg_file
+        + ' already exists. Please choose another folder.')
+    file_crs = QgsCoordinateReferenceSystem(
+        get_layer_crs_string(crs_result, transform_crs_string)
+    )
+    file_srs = osr.SpatialReference()
+    file_srs.ImportFromWkt(file_crs.toWkt())
+    file_srs.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+    gpkg_file_tmp = os.path.splitext(gpkg_file)[0]+'_incomplete.gpkg'
+    if os.path.isfile(gpkg_file_tmp):
+        os.remove(gpkg_file_tmp)  # left by a crashed import
+    gpkg_ds = ogr.GetDriverByName('GPKG').CreateDataSource(gpkg_file_tmp)
+    if gpkg_ds is None:
+        raise QgsProcessingException('Could not create file '+gpkg_file_tmp)
+    gpkg_ds.SetMetadataItem(def_all_in_one_gpkg_prefix_key, str(result_prefix))
+    write_canceled = False
+    gpkg_ds.StartTransaction()
+    try:
+        for item in gpkg_items:
+            if feedback.isCanceled():
+                write_canceled = True
+                break
+            section_name = item['section_name']
+            layer_name = item['layer_name']
+            geom_type = get_layer_geom_type(section_name, add_z_bool)
+            if geom_type != 'NoGeometry':
+                feedback.setProgressText('Writing layer for section \"'+section_name+'\"')
+            layer_fields, qgs_fields = get_layer_fields(
+                section_name,
+                layer_name,
+                geom_type,
+                item.get('custom_fields')
+            )
+            data_df = prepare_df_for_layer(
+                item['data'],
+                section_name,
+                layer_fields,
+                geom_type,
+                feedback,
+                create_empty
+            )
+            if geom_type != 'NoGeometry':
+                ogr_layer = gpkg_ds.CreateLayer(
+                    layer_name,
+                    srs=file_srs,
+                    geom_type=ogr_geom_types_dict[geom_type]
+                )
+            else:
+                ogr_layer = gpkg_ds.CreateLayer(
+                    layer_name,
+                    geom_type=ogr.wkbNone
+                )
+            for col, field_type_string in layer_fields.items():
+                field_defn = ogr.FieldDefn(col, ogr_field_types_dict[field_type_string])
+                if field_type_string == 'Bool':
+                    field_defn.SetSubType(ogr.OFSTBoolean)
+                ogr_layer.CreateField(field_defn)
+            if len(data_df) == 0:
+                continue
+            features = create_features_from_df(data_df, qgs_fields, geom_type)
+            layer_defn = ogr_layer.GetLayerDefn()
+            for f in features:
+                ogr_feature = ogr.Feature(layer_defn)
+                for i, attr_value in enumerate(f.attributes()):
+                    set_ogr_field(ogr_feature, i, attr_value)
+                if geom_type != 'NoGeometry':
+                    ogr_feature.SetGeometryDirectly(
+                        ogr.CreateGeometryFromWkb(bytes(f.geometry().asWkb()))
+                    )
+                ogr_layer.CreateFeature(ogr_feature)
+        if write_canceled:
+            gpkg_ds.RollbackTransaction()
+        else:
+            gpkg_ds.CommitTransaction()
+    except BaseException:
+        gpkg_ds.RollbackTransaction()
+        gpkg_ds = None
+        os.remove(gpkg_file_tmp)
+        raise
+    gpkg_ds = None  # closes the file
+    if write_canceled:
+        os.remove(gpkg_file_tmp)
     else:
-        return vector_layer
+        os.replace(gpkg_file_tmp, gpkg_file)
 
 
 def save_layer_to_file(
@@ -565,3 +1271,122 @@ def layerlist_to_excel(
                 'OVERWRITE': True
             }
         )
+
+
+def table_value_to_excel(attr_value, field_type_string):
+    """
+    converts a table value into a value for a workbook cell
+    :param attr_value
+    :param str field_type_string: e.g. 'Double', 'Date'
+    """
+    if isinstance(attr_value, QDate):
+        return attr_value.toPyDate() if attr_value.isValid() else None
+    if isinstance(attr_value, QTime):
+        return attr_value.toPyTime() if attr_value.isValid() else None
+    if attr_value is None or attr_value is NULL:
+        return None
+    if isinstance(attr_value, float) and np.isnan(attr_value):
+        return None
+    try:
+        if field_type_string == 'Double':
+            return float(attr_value)
+        if field_type_string == 'Int':
+            return int(float(attr_value))
+    except (TypeError, ValueError):
+        return attr_value
+    if field_type_string == 'String':
+        return str(attr_value)
+    return attr_value
+
+
+def write_workbook_from_dfs(
+    tables_dict,
+    section_name,
+    folder_save,
+    feedback,
+    result_prefix='',
+    **kwargs
+):
+    """
+    writes the tables of a section directly into an excel file;
+    the rows are streamed into a write-only workbook
+    :param dict tables_dict: DataFrames by sheet name
+    :param str section_name: name of SWMM section
+    :param str folder_save
+    :param QgsProcessingFeedback feedback
+    :param str result_prefix: prefix for file name
+    """
+    save_name = def_tables_dict[section_name]['filename']
+    if result_prefix != '':
+        save_name = result_prefix+'_'+save_name
+    fname = os.path.join(folder_save, save_name + '.xlsx')
+    feedback.setProgressText(
+        'Writing file '
+        + str(fname)
+        +' for section \"'
+        +section_name
+        +'\"'
+    )
+    if os.path.isfile(fname):
+        raise QgsProcessingException('File '+fname
+        + ' already exists. Please choose another folder.')
+    workbook = Workbook(write_only=True)
+    # sheet names and column order as in def_tables_dict
+    for sheet_name, sheet_fields in def_tables_dict[section_name]['tables'].items():
+        if sheet_name not in tables_dict.keys():
+            continue
+        data_df = tables_dict[sheet_name]
+        worksheet = workbook.create_sheet(sheet_name)
+        worksheet.append(list(sheet_fields.keys()))
+        col_values = [
+            data_df[col].tolist() if col in data_df.columns else [None] * len(data_df)
+            for col in sheet_fields.keys()
+        ]
+        field_types = list(sheet_fields.values())
+        for row in zip(*col_values):
+            worksheet.append(
+                [table_value_to_excel(v, t) for v, t in zip(row, field_types)]
+            )
+    workbook.save(fname)
+
+
+def write_tables_to_excel(
+    tables_dict,
+    section_name,
+    feedback,
+    **kwargs
+):
+    """
+    writes the tables of a section into an excel file;
+    uses a write-only workbook if openpyxl is available
+    :param dict tables_dict: DataFrames by sheet name
+    :param str section_name: name of SWMM section
+    :param QgsProcessingFeedback feedback
+    """
+    if openpyxl_available:
+        write_workbook_from_dfs(
+            tables_dict,
+            section_name,
+            feedback=feedback,
+            **kwargs
+        )
+    else:
+        layer_list = []
+        for sheet_name, df in tables_dict.items():
+            data_dict = {
+                'data': df,
+                'layer_name': sheet_name
+            }
+            created_layer = create_layer_from_df(
+                data_dict,
+                section_name,
+                feedback=feedback,
+                **kwargs
+            )
+            layer_list = layer_list+[created_layer]
+        layerlist_to_excel(
+            layer_list,
+            section_name,
+            feedback=feedback,
+            **kwargs
+        )
@@ -30,13 +30,20 @@ import pandas as pd
 import numpy as np
 from qgis.core import (
     NULL,
-    QgsGeometry
+    QgsGeometry,
+    QgsLineString,
+    QgsPointXY,
+    QgsPolygon
 )
 from .g_s_defaults import (
     def_infiltration_types,
     def_qgis_fields_dict,
     def_sections_dict
 )
+from .g_s_nodes import (
+    gather_vertex_slices,
+    group_vertices_by_name
+)
 
 
 # Export
@@ -187,89 +194,68 @@ def create_infiltr_df(infiltr_row):
     return infiltr_row
 
 # geometries
-def get_polygon_from_verts(polyg_name, dict_all_vals):
-    """
-    creates polygon geometries from vertices
-    :param str polyg_name
-    :param dict_all_vals
-    :returns: list
-    """
-    all_polygons = dict_all_vals['POLYGONS']['data']
-    verts = all_polygons.copy()[all_polygons.index == polyg_name]
-    verts = verts.reset_index(drop=True)
-    if len(verts) == 0: # no geometry given
-        polyg_geom = NULL
-    elif len(verts) < 3:  # only 1 or 2 vertices
-        # set geometry to buffer around first vertice
-        verts_points = [x.asPoint() for x in verts]
-        polyg_geom = QgsGeometry.fromPointXY(verts_points[0]).buffer(5, 5)
-    else:
-        polyg_geom = QgsGeometry.fromPolygonXY(
-            [[x.asPoint() for x in verts['geometry']]] 
-        )
-    return [polyg_name, polyg_geom]
-
 def create_polygons_df(df_processed, dict_all_vals, feedback):
     """
-    converts a point x-y-list into POINT-df
+    creates the polygon geometries for all subcatchments from the
+    grouped vertices of the POLYGONS section;
+    polygons with only 1 or 2 vertices are replaced by a buffer around the first vertex
     :param pd.DataFrame df_processed
     :param dict dict_all_vals
     :param QgsProcessingFeedback feedback
     :return: pd.DataFrame
     """
-    #polygons_created = [
-    #    get_polygon_from_verts(n, dict_all_vals) for n in df_processed['Name']
-    #]
-    polygons_created = []
-    len_itms = len(df_processed['Name'])
-    for i, n in enumerate(df_processed['Name']):
-        if feedback.isCanceled():
-            break
-        polygons_created = polygons_created + [get_polygon_from_verts(n, dict_all_vals)]
-        feedback.setProgress((i+1)/len_itms*95)
+    verts_offsets, verts_x, verts_y = group_vertices_by_name(
+        dict_all_vals['POLYGONS']['data']
+    )
+    polyg_names = df_processed['Name'].to_numpy()
+    polyg_geoms = np.full(len(polyg_names), NULL, dtype=object)  # no geometry given
+    verts_sel = verts_offsets.reindex(polyg_names)
+    verts_start = verts_sel['start'].fillna(0).to_numpy(dtype=np.int64)
+    verts_count = verts_sel['count'].fillna(0).to_numpy(dtype=np.int64)
+    # only 1 or 2 vertices: buffer around first vertex
+    is_point = (verts_count > 0) & (verts_count < 3)
+    polyg_geoms[is_point] = [
+        QgsGeometry.fromPointXY(QgsPointXY(x_p, y_p)).buffer(5, 5) for x_p, y_p in zip(
+            verts_x[verts_start[is_point]],
+            verts_y[verts_start[is_point]]
+        )
+    ]
+    feedback.setProgress(30)
+    is_polyg = verts_count >= 3
+    if is_polyg.any():
+        verts_start = verts_start[is_polyg]
+        verts_count = verts_count[is_polyg]
+        # close rings where the last vertex differs from the first one
+        verts_last = verts_start + verts_count - 1
+        is_open = (
+            (verts_x[verts_start] != verts_x[verts_last])
+            | (verts_y[verts_start] != verts_y[verts_last])
+        )
+        ring_len = verts_count + is_open
+        ring_start = np.cumsum(ring_len) - ring_len
+        verts_src = gather_vertex_slices(verts_start, verts_count)
+        verts_dst = gather_vertex_slices(ring_start, verts_count)
+        rings_x = np.empty(ring_len.sum(), dtype=np.float64)
+        rings_y = np.empty(ring_len.sum(), dtype=np.float64)
+        rings_x[verts_dst] = verts_x[verts_src]
+        rings_y[verts_dst] = verts_y[verts_src]
+        ring_end = ring_start[is_open] + ring_len[is_open] - 1
+        rings_x[ring_end] = verts_x[verts_start[is_open]]
+        rings_y[ring_end] = verts_y[verts_start[is_open]]
+        feedback.setProgress(60)
+        split_pos = ring_start[1:]
+        polyg_geoms[is_polyg] = [
+            QgsGeometry(QgsPolygon(QgsLineString(x_r.tolist(), y_r.tolist()))) for x_r, y_r in zip(
+                np.split(rings_x, split_pos),
+                np.split(rings_y, split_pos)
+            )
+        ]
     polygons_created = pd.DataFrame(
-        polygons_created,
-        columns=['Name', 'geometry']
+        {'Name': polyg_names, 'geometry': polyg_geoms}
     ).set_index('Name')
     feedback.setProgress(100)
     return polygons_created
 
-# import of rain gages
-def get_raingages_from_inp(rg_line, feedback):
-    """
-    prepares a list of raingage values in the correct order from an inp line
-    :param list rg_line
-    :return list
-    """
-    if rg_line[4] == 'TIMESERIES':
-        rg_source = {
-            'DataSource': 'TIMESERIES',
-            'SeriesName': rg_line[5],
-            'FileName': np.nan,
-            'StationID': np.nan,
-            'RainUnits': np.nan
-        }
-    else:  # FILE
-        rg_source = {
-            'DataSource': 'FILE',
-            'SeriesName': np.nan,
-            'FileName': rg_line[5],
-            'StationID': rg_line[6],
-            'RainUnits': rg_line[7]
-        }
-    interval_split = str(rg_line[2]).split(':')  # Interval splitted in HH:mm
-    if len(interval_split) == 1:
-        interval_split = interval_split + ['00']  # if only hours
-    if len(interval_split[0]) == 1:
-        interval_split[0] = '0' + interval_split[0]  # if one digit hour
-    interval = interval_split[0] + ':' + interval_split[1]
-    rg_list = [
-        rg_line[0],  # Name
-        rg_line[1],  # Format
-        interval,
-        rg_line[3]  # SCF
-    ] + list(rg_source.values())
-    return rg_list
 
 # export of rain gages
 def get_raingage_from_qgis_row(rg_row):
@@ -29,6 +29,8 @@ import numpy as np
 import os
 import pandas as pd
 from qgis.core import (
+    QgsCoordinateReferenceSystem,
+    QgsCoordinateTransform,
     QgsProcessingAlgorithm,
     QgsProcessingException,
     QgsProcessingParameterBoolean,
@@ -42,6 +44,7 @@ from qgis.core import (
 from qgis.PyQt.QtCore import QCoreApplication
 from .g_s_defaults import (
     curve_cols_dict,
+    def_all_in_one_gpkg_name,
     def_annotation_field,
     def_layer_names_dict,
     def_ogr_driver_dict,
@@ -56,34 +59,46 @@ from .g_s_defaults import (
 )
 from .g_s_read_write_data import (
     create_layer_from_df,
+    get_gpkg_table_name,
     save_layer_to_file,
-    layerlist_to_excel
+    write_all_in_one_gpkg,
+    write_layer_from_df,
+    write_tables_to_excel
 )
+from .g_s_read_text import read_text_lines
 from .g_s_import_helpers import (
     add_layer_on_completion,
     adjust_column_types,
-    adjust_line_length,
     build_df_for_section,
     build_df_from_vals_list,
-    del_kw_from_list,
-    extract_sections_from_text,
-    insert_nan_after_kw,
-    sect_list_import_handler
+    extract_sections_from_inp,
+    get_inp_sections_needed,
+    get_timeseries_from_inp,
+    get_value_pair_positions,
+    sect_list_import_geodata_parallel
 )
 
 
+# layers and tables which can be selected for the import
+import_output_names = def_sections_geoms_list + list(def_tables_dict.keys())
+
+
 class ImportInpFile (QgsProcessingAlgorithm):
     """
     generates geodata and tables from a swmm input file
     """
     ADD_Z = 'ADD_Z'
+    ALL_IN_ONE_GPKG = 'ALL_IN_ONE_GPKG'
     CREATE_EMPTY = 'CREATE_EMPTY'
     DATA_CRS = 'DATA_CRS'
     GEODATA_DRIVER = 'GEODATA_DRIVER'
+    IMPORT_SECTIONS = 'IMPORT_SECTIONS'
     INP_FILE = 'INP_FILE'
     PREFIX = 'PREFIX'
     SAVE_FOLDER = 'SAVE_FOLDER'
+    STREAM_TO_FILE = 'STREAM_TO_FILE'
     TRANSFORM_CRS = 'TRANSFORM_CRS'
+    USE_CACHE = 'USE_CACHE'
 
     def initAlgorithm(self, config):
         """
@@ -138,6 +153,43 @@ class ImportInpFile (QgsProcessingAlgorithm):
         add_z_coord_param.setFlags(add_z_coord_param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
         self.addParameter(add_z_coord_param)
 
+        import_sections_param = QgsProcessingParameterEnum(
+            self.IMPORT_SECTIONS,
+            self.tr('Layers and tables to import (all if nothing is selected)'),
+            import_output_names,
+            allowMultiple=True,
+            optional=True
+        )
+        import_sections_param.setFlags(import_sections_param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(import_sections_param)
+
+        stream_param = QgsProcessingParameterBoolean(
+            self.STREAM_TO_FILE,
+            self.tr('Write layers directly to the files (less memory for large models)'),
+            defaultValue=False,
+            optional=True
+        )
+        stream_param.setFlags(stream_param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(stream_param)
+
+        all_in_one_param = QgsProcessingParameterBoolean(
+            self.ALL_IN_ONE_GPKG,
+            self.tr('Save all layers and tables in one GeoPackage (ignores the selected geodata format)'),
+            defaultValue=False,
+            optional=True
+        )
+        all_in_one_param.setFlags(all_in_one_param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(all_in_one_param)
+
+        cache_param = QgsProcessingParameterBoolean(
+            self.USE_CACHE,
+            self.tr('Use a cache of the parsed input file (faster repeated imports, resumes canceled imports)'),
+            defaultValue=False,
+            optional=True
+        )
+        cache_param.setFlags(cache_param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(cache_param)
+
         empt_param = QgsProcessingParameterBoolean(
             self.CREATE_EMPTY,
             self.tr('Create Empty?'),
@@ -163,6 +215,9 @@ class ImportInpFile (QgsProcessingAlgorithm):
         return self.tr(""" The tool imports a swmm inp file and saves the data in a folder selected by the user (temporary folders won´t work!).\n
         You can add a prefix to the files. Try to aviod characters which could cause trouble with file systems (e.g. '.',',','\','/') \n
         The layers (e.g geopackages, shapefiles) are added to the QGIS project.\n
+        In the advanced parameters you can select the layers and tables to import. Only the necessary sections of the input file will be read.\n
+        With the advanced option "all-in-one GeoPackage" all layers and tables are saved in one GeoPackage which can be used directly in the tool GenerateSwmmInpFile.\n
+        With the advanced option "cache" the parsed input file and the prepared layers are kept in the QGIS profile folder (for the last five input files). Repeated imports of the same file skip the parsing, canceled imports continue with the remaining layers.\n
         If the tool fails to load the layers, please check the selected CRS and try again.\n
         """)
 
@@ -195,6 +250,16 @@ class ImportInpFile (QgsProcessingAlgorithm):
         create_empty = self.parameterAsBoolean(parameters, self.CREATE_EMPTY, context)
         add_z_bool = self.parameterAsBoolean(parameters, self.ADD_Z, context)
         transform_crs_string = self.parameterAsString(parameters, self.TRANSFORM_CRS, context)
+        stream_to_file = self.parameterAsBoolean(parameters, self.STREAM_TO_FILE, context)
+        all_in_one_bool = self.parameterAsBoolean(parameters, self.ALL_IN_ONE_GPKG, context)
+        use_cache = self.parameterAsBoolean(parameters, self.USE_CACHE, context)
+        import_sections_nums = self.parameterAsEnums(parameters, self.IMPORT_SECTIONS, context)
+        if len(import_sections_nums) == 0:
+            selected_outputs = import_output_names
+        else:
+            selected_outputs = [import_output_names[i] for i in import_sections_nums]
+        selected_geoms = [s for s in def_sections_geoms_list if s in selected_outputs]
+        selected_tables = [s for s in def_tables_dict.keys() if s in selected_outputs]
 
         # parameters shared by many functions
         import_parameters_dict = {
@@ -210,6 +275,21 @@ class ImportInpFile (QgsProcessingAlgorithm):
             'pluginPath': pluginPath,
             'transform_crs_string': transform_crs_string
         }
+        if transform_crs_string != 'NA':
+            # created in the main thread with the transform context of the project
+            import_parameters_dict['coord_transform'] = QgsCoordinateTransform(
+                QgsCoordinateReferenceSystem(crs_result),
+                QgsCoordinateReferenceSystem(transform_crs_string),
+                context.transformContext()
+            )
+        if all_in_one_bool:
+            all_in_one_gpkg = def_all_in_one_gpkg_name
+            if result_prefix != '':
+                all_in_one_gpkg = str(result_prefix)+'_'+all_in_one_gpkg
+            all_in_one_gpkg = os.path.join(folder_save, all_in_one_gpkg+'.gpkg')
+            import_parameters_dict['all_in_one_gpkg'] = all_in_one_gpkg
+            # layers and tables for the GeoPackage, written at once
+            gpkg_items = []
         
         # check if the selected folder is temporary
         if parameters['SAVE_FOLDER'] == 'TEMPORARY_OUTPUT':
@@ -217,9 +297,13 @@ class ImportInpFile (QgsProcessingAlgorithm):
                 'The data set needs to be saved in a directory '
                 + '(temporary folders won´t work). Please select a directoy'
             )
+        elif all_in_one_bool:
+            if os.path.isfile(all_in_one_gpkg):
+                raise QgsProcessingException('File '+all_in_one_gpkg
+                    + ' already exists. Please choose another folder.')
         else:
             # check if files are already in folder
-            for section_name in def_layer_names_dict.keys():
+            for section_name in selected_geoms:
                 layer_name = def_layer_names_dict[section_name]
                 if result_prefix != '':
                     layer_name = (
@@ -236,7 +320,7 @@ class ImportInpFile (QgsProcessingAlgorithm):
                 if os.path.isfile(fname):
                     raise QgsProcessingException('File '+fname
                         + ' already exists. Please choose another folder.')
-            for section_name in def_tables_dict.keys():
+            for section_name in selected_tables:
                 save_name = def_tables_dict[section_name]['filename']
                 if result_prefix != '':
                     save_name = str(result_prefix)+'_'+save_name
@@ -251,39 +335,50 @@ class ImportInpFile (QgsProcessingAlgorithm):
         # reading input text file
         feedback.setProgressText(self.tr('reading inp ...'))
         feedback.setProgress(3)
-        encodings = ['utf-8', 'windows-1250', 'windows-1252']  # add more
-        for e in encodings:
-            try:
-                with open(readfile, 'r', encoding=e) as f:
-                    inp_text = f.readlines()
-            except UnicodeDecodeError:
-                feedback.setProgressText('got unicode error with %s , trying different encoding' % e)
-            else:
-                feedback.setProgressText('opening the file with encoding:  %s ' % e)
-                break
-        
-        # delete unused lines
-        inp_text = [x for x in inp_text if x != '\n']
-        inp_text = [x for x in inp_text if x != '\r']
-        inp_text = [x for x in inp_text if not x.startswith(';;')]
-        inp_text = [x.replace('\n', '') for x in inp_text]
-        inp_text = [x.strip() for x in inp_text]
-
-        # SWMM sections in the text file
-        inp_text_sections = [i for i in inp_text if i.startswith('[') and i.endswith(']')]
-        pos_start_list = [inp_text.index(sect) for sect in inp_text_sections]
-        pos_end_list = pos_start_list[1:]+[len(inp_text)]
-        
-        # make a dict of sections to extract
-        dict_search = {
-            s[1:-1].upper(): [
-                pos_start_list[i],
-                pos_end_list[i]
-            ] for i, s in enumerate(inp_text_sections) if s[1:-1].upper() in def_sections_dict.keys()
-        }
-        
+        # single pass: sections, annotations and tokenized rows
+        if len(selected_outputs) == len(import_output_names):
+            section_filter = None
+        else:
+            # only the needed sections are decoded (and unknown sections for the warning)
+            sections_needed = get_inp_sections_needed(selected_outputs, add_z_bool)
+            section_filter = lambda s: s in sections_needed or s not in def_sections_dict.keys()
+        cached_sections = None
+        if use_cache:
+            from .g_s_import_cache import (
+                clean_import_cache,
+                get_import_cache_folder,
+                load_geodata_from_cache,
+                read_cache_item,
+                save_geodata_to_cache,
+                sections_from_cache,
+                sections_to_cache,
+                write_cache_item
+            )
+            cache_folder = get_import_cache_folder(readfile)
+            clean_import_cache(cache_folder)
+            cached_sections = read_cache_item(cache_folder, 'sections')
+        if cached_sections is not None:
+            feedback.setProgressText(self.tr('using the parsed input file from the cache'))
+            dict_all_vals, unknown_sections = sections_from_cache(cached_sections, section_filter)
+        elif use_cache:
+            # all sections are kept in the cache
+            dict_all_vals, unknown_sections = extract_sections_from_inp(
+                read_text_lines(readfile, feedback)
+            )
+            write_cache_item(
+                cache_folder,
+                'sections',
+                sections_to_cache(dict_all_vals, unknown_sections),
+                feedback
+            )
+            if section_filter is not None:
+                dict_all_vals = {k: v for k, v in dict_all_vals.items() if section_filter(k)}
+        else:
+            dict_all_vals, unknown_sections = extract_sections_from_inp(
+                read_text_lines(readfile, feedback, section_filter)
+            )
+
         # sections which are not available
-        unknown_sections = [s for s in inp_text_sections if not s[1:-1].upper() in def_sections_dict.keys()]
         if len(unknown_sections) > 0:
             feedback.pushWarning(
                             'Warning: unknown sections in input file: '
@@ -291,15 +386,6 @@ class ImportInpFile (QgsProcessingAlgorithm):
                             + 'These sections will be ignored'
                         )
 
-        # dict for raw values for every section
-        dict_all_vals = {
-            k: extract_sections_from_text(
-                inp_text,
-                dict_search[k],
-                k
-            ) for k in dict_search.keys()
-        }  
-        
         # sections which will be converted into tables
         # --------------------------------------------
         dict_res_table = {}
@@ -371,16 +457,12 @@ class ImportInpFile (QgsProcessingAlgorithm):
                 def_sections_dict['DWF']
             )
         if 'HYDROGRAPHS' in dict_all_vals.keys():
-            from .g_s_nodes import get_hydrogrphs
+            from .g_s_nodes import get_hydrographs_from_inp
             df_hydrographs_raw = build_df_for_section(
                 'HYDROGRAPHS',
                 dict_all_vals
             )
-            hg_name_list = np.unique(df_hydrographs_raw['Name'])
-            df_hydrographs = pd.DataFrame()
-            for hg_name in hg_name_list:
-                df_hydrographs = pd.concat([df_hydrographs, get_hydrogrphs(hg_name, df_hydrographs_raw)])
-            df_hydrographs = df_hydrographs.reset_index(drop=True)
+            df_hydrographs = get_hydrographs_from_inp(df_hydrographs_raw)
         else:
             df_hydrographs = build_df_from_vals_list(
                 [],
@@ -415,52 +497,36 @@ class ImportInpFile (QgsProcessingAlgorithm):
             if len(all_patterns) == 0:
                 all_patterns = dict()
             else:
-                occuring_patterns_types = all_patterns.loc[all_patterns[1].isin(pattern_types), [0, 1]].set_index(0)
-                occuring_patterns_types.columns = ["PatternType"]
-                all_patterns = all_patterns.fillna(np.nan)
-                all_patterns = all_patterns.replace({
-                    'HOURLY': np.nan,
-                    'DAILY': np.nan,
-                    'MONTHLY': np.nan,
-                    'WEEKEND': np.nan
-                })
-
-                def adjust_patterns_df(pattern_row):
-                    """
-                    reorders a list of the patterns section for the input file
-                    :param list pattern_row
-                    :return: pd.DataFrame
-                    """
-                    pattern_adjusted = [[pattern_row[0], i] for i in pattern_row[1:] if pd.notna(i)]
-                    return (pd.DataFrame(pattern_adjusted, columns=['Name', 'Factor']))
-
-                all_patterns = pd.concat([adjust_patterns_df(all_patterns.loc[i, :]) for i in all_patterns.index])
-                all_patterns = all_patterns.join(
-                    occuring_patterns_types,
-                    on='Name'
+                occuring_patterns_types = all_patterns.loc[all_patterns[1].isin(pattern_types), [0, 1]]
+                occuring_patterns_types = occuring_patterns_types.drop_duplicates(subset=0).set_index(0)[1]
+                factor_cols = list(all_patterns.columns[1:])
+                # keywords are no factors
+                all_patterns[factor_cols] = all_patterns[factor_cols].mask(
+                    all_patterns[factor_cols].isin(pattern_types)
                 )
-                all_patterns = {k: v.iloc[:, :-1] for k, v in all_patterns.groupby("PatternType")}
+                # one row per factor, in the order of the input file
+                all_patterns = all_patterns.melt(
+                    id_vars=[0],
+                    value_vars=factor_cols,
+                    value_name='Factor',
+                    ignore_index=False
+                ).sort_index(kind='stable')
+                all_patterns = all_patterns.rename(columns={0: 'Name'}).dropna(subset=['Factor'])
+                all_patterns['PatternType'] = all_patterns['Name'].map(occuring_patterns_types)
+                all_patterns = {
+                    k: v[['Name', 'Factor']].reset_index(drop=True) for k, v in all_patterns.groupby('PatternType')
+                }
         else:
             all_patterns = dict()
 
-        def add_pattern_timesteps(pattern_type):
-            """
-            adds time strings from the pattern_times dict
-            :param str pattern_row
-            :return: list
-            """
-            count_patterns = int(len(all_patterns[pattern_type])/len(pattern_times[pattern_type]))
-            new_col = pattern_times[pattern_type]*count_patterns
-            return new_col
         for pattern_type in pattern_cols.keys():
             if pattern_type in all_patterns.keys():
-                all_patterns[pattern_type]['Time'] = add_pattern_timesteps(pattern_type)
+                # time steps from the pattern_times dict by position in the pattern
+                type_times = np.array(pattern_times[pattern_type], dtype=object)
+                pattern_positions = all_patterns[pattern_type].groupby('Name').cumcount().to_numpy()
+                all_patterns[pattern_type]['Time'] = type_times[pattern_positions % len(type_times)]
                 all_patterns[pattern_type] = all_patterns[pattern_type][['Name', 'Time', 'Factor']]
-                if pattern_type == 'DAILY':
-                    all_patterns[pattern_type] = all_patterns[pattern_type].rename({'Time': 'Day'})
-                if pattern_type == 'MONTHLY':
-                    all_patterns[pattern_type] = all_patterns[pattern_type].rename({'Time': 'Month'})
-                all_patterns[pattern_type]['Factor'] = [float(x) for x in all_patterns[pattern_type]['Factor']]
+                all_patterns[pattern_type]['Factor'] = all_patterns[pattern_type]['Factor'].astype(float)
                 all_patterns[pattern_type].columns = pattern_cols[pattern_type]
             else:
                 all_patterns[pattern_type] = build_df_from_vals_list([], pattern_cols[pattern_type])
@@ -471,17 +537,31 @@ class ImportInpFile (QgsProcessingAlgorithm):
             section_name = 'CURVES'
             feedback.setProgressText('Preparing section \"'+section_name+'\"')
             feedback.setProgress(16)
-            curve_type_dict = {x[0]: x[1] for x in dict_all_vals['CURVES']['data'] if x[1].capitalize() in curve_cols_dict.keys()}
-            occuring_curve_types = list(set(curve_type_dict.values()))
-            all_curves = [del_kw_from_list(x, occuring_curve_types, 1) for x in dict_all_vals['CURVES']['data'].copy()]
-            all_curves = build_df_from_vals_list(
-                all_curves,
-                def_sections_dict['CURVES']
+            curves_raw = pd.DataFrame(dict_all_vals['CURVES']['data'])
+            curves_raw = curves_raw.reindex(columns=range(max(4, len(curves_raw.columns))))  # empty section
+            # lines with the curve type: [Name, CurveType, XVal, YVal, ...]
+            curve_kw_rows = curves_raw[1].astype(str).str.capitalize().isin(curve_cols_dict.keys())
+            curve_types = curves_raw.loc[curve_kw_rows, [0, 1]].drop_duplicates(subset=0).set_index(0)[1]
+            curve_types = curve_types.astype(str).str.capitalize()  # capitalize as in curve_cols_dict
+            # one row per X-Y pair, also for lines with several pairs
+            curves_arr = curves_raw.to_numpy(dtype=object)
+            curve_vals_mask = curves_raw.notna().to_numpy(copy=True)
+            curve_vals_mask[:, 0] = False
+            curve_vals_mask[curve_kw_rows.to_numpy(), 1] = False
+            pair_rows, x_cols, y_cols = get_value_pair_positions(
+                curve_vals_mask,
+                curves_arr[:, 0],
+                section_name
             )
-            all_curves['CurveType'] = [curve_type_dict[i].capitalize() for i in all_curves['Name']]  # capitalize as in curve_cols_dict
-            all_curves['XVal'] = [float(x) for x in all_curves['XVal']]
-            all_curves['YVal'] = [float(x) for x in all_curves['YVal']]
-            all_curves = {k: v[['Name', 'XVal', 'YVal']] for k, v in all_curves.groupby('CurveType')}
+            all_curves = pd.DataFrame({
+                'Name': curves_arr[pair_rows, 0],
+                'XVal': curves_arr[pair_rows, x_cols].astype(float),
+                'YVal': curves_arr[pair_rows, y_cols].astype(float)
+            })
+            all_curves['CurveType'] = all_curves['Name'].map(curve_types)
+            all_curves = {
+                k: v[['Name', 'XVal', 'YVal']].reset_index(drop=True) for k, v in all_curves.groupby('CurveType')
+            }
         else:
             all_curves = dict()
         for curve_type in curve_cols_dict.keys():
@@ -533,17 +613,10 @@ class ImportInpFile (QgsProcessingAlgorithm):
         # timeseries section
         ts_cols_dict = def_tables_dict['TIMESERIES']['tables']['TIMESERIES']
         if 'TIMESERIES' in dict_all_vals.keys():
-            all_time_series = [adjust_line_length(x, 1, 4) for x in dict_all_vals['TIMESERIES']['data'].copy()]
-            # for external File
-            all_time_series = [insert_nan_after_kw(x, 2, 'FILE', [3, 4]) for x in all_time_series]
-            all_time_series = [del_kw_from_list(x, 'FILE', 2) for x in all_time_series]
-            all_time_series = build_df_from_vals_list(
-                all_time_series,
-                def_sections_dict['TIMESERIES']
-            )
+            all_time_series = get_timeseries_from_inp(dict_all_vals['TIMESERIES']['data'])
         else:
             all_time_series = build_df_from_vals_list([], list(ts_cols_dict.keys()))
-        all_time_series = adjust_column_types(all_time_series, ts_cols_dict)
+            all_time_series = adjust_column_types(all_time_series, ts_cols_dict)
         dict_res_table['TIMESERIES'] = {'TIMESERIES': all_time_series}
 
         # streets and inlets section
@@ -554,9 +627,8 @@ class ImportInpFile (QgsProcessingAlgorithm):
             street_data = {}
             street_data['STREETS'] = build_df_for_section('STREETS', dict_all_vals)
             if 'INLETS' in dict_all_vals.keys():
-                from .g_s_links import get_inlet_from_inp
-                inl_list = [get_inlet_from_inp(inl_line) for inl_line in dict_all_vals['INLETS']['data']]
-                street_data['INLETS'] = build_df_from_vals_list(inl_list, def_sections_dict['INLETS'])
+                from .g_s_inp_layouts import build_df_by_layout
+                street_data['INLETS'] = build_df_by_layout('INLETS', dict_all_vals['INLETS'])
             else:
                 street_data['INLETS'] = build_df_for_section('INLETS', dict_all_vals)
             street_data['INLET_USAGE'] = build_df_for_section('INLET_USAGE', dict_all_vals)
@@ -565,75 +637,13 @@ class ImportInpFile (QgsProcessingAlgorithm):
         # transects in hec2 format
         if 'TRANSECTS' in dict_all_vals.keys():
             feedback.setProgress(1)
-            transects_columns = [
-                'TransectName',
-                'RoughnessLeftBank',
-                'RoughnessRightBank',
-                'RoughnessChannel',
-                'BankStationLeft',
-                'BankStationRight',
-                'ModifierMeander',
-                'ModifierStations',
-                'ModifierElevations'
-            ]
             section_name = 'TRANSECTS'
             feedback.setProgressText('Preparing section \"'+section_name+'\"')
-            transects_list = dict_all_vals['TRANSECTS']['data'].copy()
-            tr_startp = [i for i, x in enumerate(transects_list) if x[0] == 'NC']
-            n_trans = len(tr_startp)
-            tr_endp = tr_startp[1:]+[len(transects_list)]
-
-            def get_transects_data2(tr_i):
-                tr_roughness = [float(x) for x in tr_i[0][1:]]
-                tr_name = tr_i[1][1]
-                tr_count = tr_i[1][2]
-                tr_bankstat_left = float(tr_i[1][3])
-                tr_bankstat_right = float(tr_i[1][4])
-                tr_modifier = [float(x) for x in tr_i[1][7:10]]
-                tr_data = [tr_name]+tr_roughness+[tr_bankstat_left]+[tr_bankstat_right]+tr_modifier
-                tr_values = [del_kw_from_list(x, 'GR', 0) for x in tr_i[2:]]
-                tr_values = [x for sublist in tr_values for x in sublist]
-                tr_values_splitted = [[
-                    tr_name,
-                    float(tr_values[x*2]),   # split into list of lists of len 2
-                    float(tr_values[(x*2)+1])
-                ] for x in range(int(tr_count))]
-                return tr_values_splitted, tr_data
-                
-            all_tr_vals = []
-            all_tr_dats = []
-            for i, x in enumerate(zip(tr_startp, tr_endp)):
-                if feedback.isCanceled():
-                    break
-                val, dat = get_transects_data2(transects_list[x[0]:x[1]])
-                all_tr_vals = all_tr_vals + val
-                all_tr_dats = all_tr_dats + [dat]
-                feedback.setProgress(((i+1)/n_trans)*90)
-
-            all_tr_vals_df = build_df_from_vals_list(
-                all_tr_vals,
-                ['TransectName', 'Elevation', 'Station']
+            from .g_s_links import get_transects_from_inp
+            all_tr_dats_df, all_tr_vals_df = get_transects_from_inp(
+                dict_all_vals['TRANSECTS']['data'],
+                feedback
             )
-            feedback.setProgress(92)
-            all_tr_vals_df = all_tr_vals_df[[
-                'TransectName',
-                'Station',
-                'Elevation'
-            ]]  # order of columns according to swmm interface
-            feedback.setProgress(93)
-            all_tr_dats_df = build_df_from_vals_list(all_tr_dats, transects_columns)
-            feedback.setProgress(94)
-            all_tr_dats_df = all_tr_dats_df[[
-                'TransectName',
-                'RoughnessLeftBank',
-                'RoughnessRightBank',
-                'RoughnessChannel',
-                'BankStationLeft',
-                'BankStationRight',
-                'ModifierStations',
-                'ModifierElevations',
-                'ModifierMeander'
-            ]]  # order of columns according to swmm interface
             transects_dict = {
                 'Data': all_tr_dats_df,
                 'XSections': all_tr_vals_df
@@ -645,47 +655,57 @@ class ImportInpFile (QgsProcessingAlgorithm):
 
         # writing tables: 
         feedback.setProgressText('Writing tables ...')
+        dict_res_table = {k: v for k, v in dict_res_table.items() if k in selected_tables}
         n_itms = len(dict_res_table)
         for i, it in enumerate(dict_res_table.items()):
             if feedback.isCanceled():
                 break
-            layer_list = []
             section_name = it[0]
-            for sheet_name, df in it[1].items():
-                data_dict = {
-                    'data': df,
-                    'layer_name': sheet_name
-                }
-                created_layer = create_layer_from_df(
-                    data_dict,
+            if all_in_one_bool:
+                # written together with the layers
+                for sheet_name, df in it[1].items():
+                    gpkg_items.append({
+                        'data': df,
+                        'layer_name': get_gpkg_table_name(section_name, sheet_name, result_prefix),
+                        'section_name': section_name
+                    })
+            else:
+                write_tables_to_excel(
+                    it[1],
                     section_name,
                     feedback=feedback,
                     **import_parameters_dict
                 )
-                layer_list = layer_list+[created_layer]
-            layerlist_to_excel(
-                layer_list,
-                section_name,
-                feedback = feedback,
-                **import_parameters_dict
-            )
-            del layer_list
 
         # sections with geometries, which will be added as layers
         #------------------------------
         # prepare
         feedback.setProgress(0)
-        for section_name in def_sections_geoms_list:  # the list is used to keep the order
-            if feedback.isCanceled():
-                break
-            if section_name in dict_all_vals.keys():
-                sect_list_import_handler(
-                    section_name,
-                    dict_all_vals,
-                    'geodata',
-                    feedback,
-                    import_parameters_dict
-                )
+        if use_cache:
+            geoms_to_prepare = load_geodata_from_cache(
+                selected_geoms,
+                dict_all_vals,
+                cache_folder,
+                import_parameters_dict,
+                feedback
+            )
+        else:
+            geoms_to_prepare = selected_geoms
+        sect_list_import_geodata_parallel(
+            geoms_to_prepare,  # the list is used to keep the order
+            dict_all_vals,
+            feedback,
+            import_parameters_dict
+        )
+        if use_cache:
+            # prepared sections are kept, also if the import was canceled
+            save_geodata_to_cache(
+                geoms_to_prepare,
+                dict_all_vals,
+                cache_folder,
+                import_parameters_dict,
+                feedback
+            )
 
         # make layers
         n_itms = len(def_sections_geoms_dict.keys())
@@ -704,20 +724,45 @@ class ImportInpFile (QgsProcessingAlgorithm):
                     else:
                         layer_name = def_layer_names_dict[section_name]
                     data_dict['layer_name'] = layer_name
-                    created_layer = create_layer_from_df(
-                        data_dict,
-                        section_name,
-                        feedback=feedback,
-                        custom_fields=def_annotation_field,
-                        **import_parameters_dict
-                    )
-                    save_layer_to_file(
-                        created_layer,
-                        layer_name,
-                        **import_parameters_dict
-                    )
+                    if all_in_one_bool:
+                        # the GeoPackage is written after all layers are prepared
+                        gpkg_items.append({
+                            'data': data_dict['data'],
+                            'layer_name': layer_name,
+                            'section_name': section_name,
+                            'custom_fields': def_annotation_field
+                        })
+                    elif stream_to_file:
+                        write_layer_from_df(
+                            data_dict,
+                            section_name,
+                            feedback=feedback,
+                            custom_fields=def_annotation_field,
+                            **import_parameters_dict
+                        )
+                    else:
+                        created_layer = create_layer_from_df(
+                            data_dict,
+                            section_name,
+                            feedback=feedback,
+                            custom_fields=def_annotation_field,
+                            **import_parameters_dict
+                        )
+                        save_layer_to_file(
+                            created_layer,
+                            layer_name,
+                            **import_parameters_dict
+                        )
                     dict_all_vals[section_name]['status'] = ImportDataStatus.FILE_READY
             feedback.setProgress((n+1)/n_itms*100)
+        if all_in_one_bool and not feedback.isCanceled():
+            feedback.setProgressText('Writing file '+all_in_one_gpkg)
+            write_all_in_one_gpkg(
+                gpkg_items,
+                all_in_one_gpkg,
+                feedback=feedback,
+                **import_parameters_dict
+            )
 
         # add layers to canvas
         feedback.setProgressText(
@@ -62,6 +62,7 @@ from .g_s_export_helpers import (
 )
 from .g_s_links import del_first_last_vt
 from .g_s_read_write_data import (
+    add_gpkg_to_export_data,
     read_data_direct
 )
 
@@ -90,6 +91,7 @@ class GenerateSwmmInpFile(QgsProcessingAlgorithm):
     FILE_QUALITY = 'FILE_QUALITY'
     FILE_TRANSECTS = 'FILE_TRANSECTS'
     FILE_STREETS = 'FILE_STREETS'
+    FILE_ALL_IN_ONE_GPKG = 'FILE_ALL_IN_ONE_GPKG'
     USE_Z_VALS = 'USE_Z_VALS'
 
     def initAlgorithm(self, config):
@@ -277,6 +279,19 @@ class GenerateSwmmInpFile(QgsProcessingAlgorithm):
         use_z_vals_param.setFlags(use_z_vals_param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
         self.addParameter(use_z_vals_param)
 
+        all_in_one_param = QgsProcessingParameterFile(
+            self.FILE_ALL_IN_ONE_GPKG,
+            self.tr(
+                'All-in-one GeoPackage (used for all layers and tables'
+                +' which are not selected above)'
+            ),
+            QgsProcessingParameterFile.File,
+            optional=True,
+            fileFilter='GeoPackage (*.gpkg)'
+        )
+        all_in_one_param.setFlags(all_in_one_param.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+        self.addParameter(all_in_one_param)
+
     def processAlgorithm(self, parameters, context, feedback):
         """
         main process algorithm of this tool
@@ -345,6 +360,9 @@ class GenerateSwmmInpFile(QgsProcessingAlgorithm):
         }
         export_data = {k: v for k, v in export_data.items() if v['file'] is not None}
         export_data = {k: v for k, v in export_data.items() if v['file'] != ''}
+        all_in_one_gpkg = self.parameterAsString(parameters, self.FILE_ALL_IN_ONE_GPKG, context)
+        if all_in_one_gpkg != '':
+            add_gpkg_to_export_data(all_in_one_gpkg, export_data, feedback)
         
         # adding data type information
         for k in export_data.keys():
@@ -597,7 +615,8 @@ class GenerateSwmmInpFile(QgsProcessingAlgorithm):
         1) load default data with the first tool.\n
         2) copy all files to a new folder and edit the data set.\n
         3) select the edited layers / files to create the input file (.inp)\n
-        4) run the input file in swmm
+        4) run the input file in swmm\n
+        Instead of single layers and tables, an all-in-one GeoPackage created by the import tool can be selected in the advanced parameters.
         """)
 
     def name(self):
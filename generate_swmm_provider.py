@@ -34,6 +34,7 @@ from qgis.core import QgsProcessingProvider
 from .generate_swmm_inp_file import GenerateSwmmInpFile
 from .generate_default_data import GenerateDefaultFolder
 from .generate_swmm_import_inp_file import ImportInpFile
+from .inspect_inp_file import InspectInpFile
 from .create_submodel import CreateSubModel
 from qgis.PyQt.QtGui import QIcon
 import os
@@ -62,6 +63,7 @@ class GenerateSwmmProvider(QgsProcessingProvider):
         self.addAlgorithm(GenerateSwmmInpFile())
         self.addAlgorithm(GenerateDefaultFolder())
         self.addAlgorithm(ImportInpFile())
+        self.addAlgorithm(InspectInpFile())
         self.addAlgorithm(CreateSubModel())
 
     def id(self):
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ GenerateSwmmInp
+                                 A QGIS plugin
+ This plugin generates SWMM Input files
+ Generated by Plugin Builder: http://g-sherman.github.io/Qgis-Plugin-Builder/
+                              -------------------
+        begin                : 2021-07-09
+        copyright            : (C) 2021 by Jannik Schilling
+        email                : jannik.schilling@posteo.de
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+
+__author__ = 'Jannik Schilling'
+__date__ = '2024-04-29'
+__copyright__ = '(C) 2021 by Jannik Schilling'
+
+import json
+from qgis.PyQt.QtCore import QCoreApplication
+from qgis.core import (
+    QgsProcessingAlgorithm,
+    QgsProcessingOutputNumber,
+    QgsProcessingOutputString,
+    QgsProcessingParameterFile
+)
+from .g_s_import_helpers import get_inp_sections_stats
+
+
+class InspectInpFile(QgsProcessingAlgorithm):
+    """
+    reports the contents of a swmm input file before an import
+    """
+    INP_FILE = 'INP_FILE'
+    SECTIONS = 'SECTIONS'
+    UNKNOWN_SECTIONS = 'UNKNOWN_SECTIONS'
+    N_OBJECTS = 'N_OBJECTS'
+    N_VERTICES = 'N_VERTICES'
+    EST_MEMORY_MB = 'EST_MEMORY_MB'
+    EST_OUTPUT_MB = 'EST_OUTPUT_MB'
+
+    def initAlgorithm(self, config):
+        """
+        inputs and outputs of the algorithm
+        """
+        self.addParameter(
+            QgsProcessingParameterFile(
+                name=self.INP_FILE,
+                description=self.tr('SWMM input file to inspect'),
+                extension='inp'
+            )
+        )
+        self.addOutput(
+            QgsProcessingOutputString(
+                self.SECTIONS,
+                self.tr('Statistics by section (JSON)')
+            )
+        )
+        self.addOutput(
+            QgsProcessingOutputString(
+                self.UNKNOWN_SECTIONS,
+                self.tr('Unknown sections')
+            )
+        )
+        self.addOutput(
+            QgsProcessingOutputNumber(
+                self.N_OBJECTS,
+                self.tr('Number of objects')
+            )
+        )
+        self.addOutput(
+            QgsProcessingOutputNumber(
+                self.N_VERTICES,
+                self.tr('Number of vertices')
+            )
+        )
+        self.addOutput(
+            QgsProcessingOutputNumber(
+                self.EST_MEMORY_MB,
+                self.tr('Estimated memory for the import (MB)')
+            )
+        )
+        self.addOutput(
+            QgsProcessingOutputNumber(
+                self.EST_OUTPUT_MB,
+                self.tr('Estimated size of the imported files (MB)')
+            )
+        )
+
+    def name(self):
+        return 'InspectInpFile'
+
+    def shortHelpString(self):
+        return self.tr(""" The tool reads a swmm inp file once (without importing it) and reports the number of rows, objects and vertices in every section as well as unknown sections.\n
+        The memory needed for the import and the size of the imported layers and tables are rough estimates.\n
+        Use it to check a large model before running ImportInpFile.\n
+        """)
+
+    def displayName(self):
+        return self.tr('5_InspectInpFile')
+
+    def group(self):
+        return self.tr(self.groupId())
+
+    def groupId(self):
+        return ''
+
+    def tr(self, string):
+        return QCoreApplication.translate('Processing', string)
+
+    def createInstance(self):
+        return InspectInpFile()
+
+    def processAlgorithm(self, parameters, context, feedback):
+        readfile = self.parameterAsString(parameters, self.INP_FILE, context)
+        feedback.setProgressText(self.tr('reading inp ...'))
+        feedback.setProgress(5)
+        sections_stats, unknown_sections = get_inp_sections_stats(readfile)
+        feedback.setProgress(90)
+        feedback.pushInfo('section: rows, objects, vertices, memory (MB), output (MB)')
+        for section_name, section_stats in sections_stats.items():
+            feedback.pushInfo(
+                section_name + ': '
+                + ', '.join(str(v) for v in section_stats.values())
+            )
+        if len(unknown_sections) > 0:
+            feedback.pushWarning(
+                'Warning: unknown sections in input file: '
+                + ', '.join(unknown_sections)
+                + '. These sections will be ignored by the import'
+            )
+        est_memory_mb = round(sum(s['memory_mb'] for s in sections_stats.values()), 2)
+        est_output_mb = round(sum(s['output_mb'] for s in sections_stats.values()), 2)
+        feedback.pushInfo(
+            'Estimated memory for the import: ' + str(est_memory_mb) + ' MB, '
+            + 'estimated size of the imported files: ' + str(est_output_mb) + ' MB'
+        )
+        feedback.setProgress(100)
+        return {
+            self.SECTIONS: json.dumps(sections_stats),
+            self.UNKNOWN_SECTIONS: ', '.join(unknown_sections),
+            self.N_OBJECTS: sum(s['objects'] for s in sections_stats.values()),
+            self.N_VERTICES: sum(s['vertices'] for s in sections_stats.values()),
+            self.EST_MEMORY_MB: est_memory_mb,
+            self.EST_OUTPUT_MB: est_output_mb
+        }